@@ -0,0 +1,54 @@
+import statistics
+import sys
+import time
+
+from src.driver import BLOCK_PROFILES, DriverManager, apply_block_profile
+from src.readiness import wait_for_page
+
+REPEAT = 5
+
+# Navigation timing plus every fetched resource, so blocked requests show up as saved bytes
+TRANSFER_SCRIPT = """
+const nav = performance.getEntriesByType("navigation")[0];
+const resources = performance.getEntriesByType("resource");
+return {
+    load_ms: nav ? nav.loadEventEnd - nav.startTime : null,
+    requests: resources.length + 1,
+    bytes: resources.reduce((total, r) => total + r.transferSize, nav ? nav.transferSize : 0)
+};
+"""
+
+
+def measure(manager, url, profile):
+    samples = []
+    for _ in range(REPEAT):
+        with manager.driver() as driver:
+            apply_block_profile(driver, profile)
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            start = time.perf_counter()
+            driver.get(url)
+            state = wait_for_page(driver)
+            ready_ms = (time.perf_counter() - start) * 1000
+            timing = driver.execute_script(TRANSFER_SCRIPT)
+            samples.append((ready_ms, timing['requests'], timing['bytes'], state))
+    return samples
+
+
+def run(url):
+    # Needs a local Chrome and a reachable listing; one warm driver is shared so startup is excluded
+    manager = DriverManager()
+    manager.warm()
+    try:
+        print(f"{url}: {REPEAT} loads per profile")
+        for profile in BLOCK_PROFILES:
+            samples = measure(manager, url, profile)
+            print(f"  {profile:>10}: {statistics.median(s[0] for s in samples):8.0f} ms to ready, "
+                  f"{statistics.median(s[1] for s in samples):4.0f} requests, "
+                  f"{statistics.median(s[2] for s in samples) / 1024:8.1f} KiB transferred, "
+                  f"states={sorted({s[3] for s in samples})}")
+    finally:
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else 'https://www.hermes.com/au/en/category/women/bags-and-small-leather-goods/bags-and-clutches/')
@@ -0,0 +1,65 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+from src.dynamo_export import ingest
+from src.sql_store import connect, load_csv
+
+
+def write_export(csv_path, directory, copies, files):
+    # Repeats the history with shifted timestamps so the export has copies x its rows
+    with open(csv_path, newline='') as file:
+        rows = list(csv.DictReader(file))
+    span = max(int(row['timestamp']) for row in rows) - min(int(row['timestamp']) for row in rows) + 1
+    handles = [gzip.open(os.path.join(directory, f'{i:05d}.json.gz'), 'wt') for i in range(files)]
+    for copy in range(copies):
+        for n, row in enumerate(rows):
+            timestamp = int(row['timestamp']) + copy * span
+            item = {'uuid': {'S': f"{row['item_id']}{timestamp}"}, 'item_id': {'S': row['item_id']},
+                    'timestamp': {'N': str(timestamp)}, 'price': {'N': row['price']}, 'url': {'S': row['url']},
+                    'color': {'S': row['color']}, 'title': {'S': row['title']}}
+            handles[n % files].write(json.dumps({'Item': item}) + '\n')
+    for handle in handles:
+        handle.close()
+    return len(rows) * copies
+
+
+def notebook_convert(directory, output_file):
+    # The first cell of manual.ipynb, reading the same gzip files
+    with open(output_file, 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=['uuid', 'item_id', 'timestamp', 'price', 'url', 'color', 'title'])
+        writer.writeheader()
+        for name in sorted(os.listdir(directory)):
+            with gzip.open(os.path.join(directory, name), 'rt') as file:
+                for line in file:
+                    item = json.loads(line)
+                    writer.writerow({field: item['Item'][field].get('S', item['Item'][field].get('N'))
+                                     for field in writer.fieldnames})
+
+
+def run(csv_path, copies=40, files=16):
+    with tempfile.TemporaryDirectory() as directory:
+        export_dir = os.path.join(directory, 'export')
+        os.makedirs(export_dir)
+        total = write_export(csv_path, export_dir, copies, files)
+
+        start = time.perf_counter()
+        notebook_convert(export_dir, os.path.join(directory, 'output.csv'))
+        load_csv(connect(os.path.join(directory, 'notebook.sqlite')), os.path.join(directory, 'output.csv'))
+        notebook_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        inserted = ingest(connect(os.path.join(directory, 'inventory.sqlite')), export_dir)
+        ingest_time = time.perf_counter() - start
+
+    print(f"{total} records in {files} files: notebook csv + load_csv={notebook_time:.2f}s "
+          f"({total / notebook_time:,.0f}/s), ingest into store={ingest_time:.2f}s ({total / ingest_time:,.0f}/s), "
+          f"{inserted} observations")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else '../../output.csv')
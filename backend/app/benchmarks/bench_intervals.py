@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+
+from src.analysis import mark_new_items
+from src.history import read_csv_table, write_history
+from src.intervals import compact_observations, new_observations, write_intervals
+
+
+def run(csv_path):
+    table = read_csv_table(csv_path)
+    df = table.to_pandas()
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, 'history.parquet')
+        interval_path = os.path.join(directory, 'intervals.parquet')
+        write_history(table, snapshot_path)
+
+        start = time.perf_counter()
+        intervals, runs = compact_observations(df)
+        compact_time = time.perf_counter() - start
+        write_intervals(intervals, runs, interval_path)
+        sizes = {name: os.path.getsize(path) for name, path in
+                 [('csv', csv_path), ('snapshot parquet', snapshot_path), ('interval parquet', interval_path)]}
+
+    print(f"{csv_path}: {len(df)} observations, {len(runs)} runs -> {len(intervals)} intervals in {compact_time:.3f}s")
+    for name, size in sizes.items():
+        print(f"  {name:>16}: {size / 1024:9.1f} KiB ({sizes['csv'] / size:6.1f}x smaller than csv)")
+
+    start = time.perf_counter()
+    marked = mark_new_items(df)
+    rows_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new = new_observations(intervals, runs)
+    intervals_time = time.perf_counter() - start
+    expected = set(zip(marked.loc[marked['is_new'] == '1', 'item_id'], marked.loc[marked['is_new'] == '1', 'timestamp']))
+    identical = set(zip(new['item_id'], new['timestamp'])) == expected
+    print(f"  is_new: rows={rows_time:.4f}s intervals={intervals_time:.4f}s identical={identical}")
+
+
+if __name__ == "__main__":
+    for csv_path in sys.argv[1:] or ['../../output.csv']:
+        run(csv_path)
@@ -0,0 +1,70 @@
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import mark_new_items
+
+
+def notebook_mark_new_items(df):
+    # The row-wise implementation from manual.ipynb, minus the per-row print
+    df = df.sort_values('timestamp')
+    latest_items = {}
+    timestamp_queue = deque([df['timestamp'].iloc[0]])
+
+    def mark(row):
+        item_id = row['item_id']
+        timestamp = row['timestamp']
+        if timestamp not in latest_items:
+            latest_items[timestamp] = set()
+        if timestamp_queue[0] != timestamp and timestamp not in timestamp_queue:
+            timestamp_queue.append(timestamp)
+            if len(timestamp_queue) > 2:
+                timestamp_queue.popleft()
+        prev_max_timestamp = timestamp_queue[0]
+        if item_id not in latest_items[prev_max_timestamp]:
+            row['is_new'] = '1'
+            latest_items[timestamp].add(item_id)
+        else:
+            row['is_new'] = '0'
+        return row
+
+    return df.apply(mark, axis=1)
+
+
+def synthetic_history(rows, seed=0):
+    # Snapshots of ~40 items drawn from a catalog of 500, so items come and go
+    rng = np.random.default_rng(seed)
+    snapshots = max(rows // 40, 1)
+    return pd.DataFrame({
+        'item_id': [f"H{code:06d}" for code in rng.integers(0, 500, rows)],
+        'timestamp': 1716155767 + 600 * np.sort(rng.integers(0, snapshots, rows)),
+        'price': rng.integers(1000, 50000, rows),
+    })
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return result, time.perf_counter() - start
+
+
+def bench(name, df, reference=True):
+    fast, fast_time = timed(mark_new_items, df)
+    line = f"{name:>24} rows={len(df):>9} vectorized={fast_time:.4f}s"
+    if reference:
+        slow, slow_time = timed(notebook_mark_new_items, df)
+        # Compare per row: both keep every input row, only the tie order within a timestamp may differ
+        matches = (fast.set_index(['item_id', 'timestamp'])['is_new'].sort_index()
+                   .equals(slow.set_index(['item_id', 'timestamp'])['is_new'].sort_index()))
+        line += f" notebook={slow_time:.4f}s speedup={slow_time / fast_time:.0f}x identical={matches}"
+    print(line)
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else '../../output.csv'
+    bench('output.csv', pd.read_csv(csv_path))
+    bench('synthetic', synthetic_history(20_000))
+    bench('synthetic', synthetic_history(10_000_000), reference=False)
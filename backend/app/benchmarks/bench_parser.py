@@ -0,0 +1,67 @@
+import resource
+import subprocess
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from src.listing_parser import extract_item_info
+
+REPEAT = 20
+
+
+def bs4_extract_item_info(page_source):
+    # The html.parser implementation that extract_item_info replaced
+    soup = BeautifulSoup(page_source, 'html.parser')
+    items = []
+    for div in soup.find_all('div', class_='product-grid-list-item'):
+        img_tag = div.find('img')
+        items.append({
+            'item_id': div['id'].replace('grid-product-', ''),
+            'title': div.find('span', class_='product-item-name').text.strip(),
+            'color': div.find('span', class_='product-item-colors').text.split(':')[-1].strip(),
+            'url': div.find('a')['href'],
+            'price': int(div.find('span', class_='price').text.replace('AU$', '').replace(',', '')),
+            'unavailable': 'Unavailable' in div.text,
+            'image_url': img_tag['src'] if img_tag else None
+        })
+    return items
+
+
+PARSERS = {'bs4': bs4_extract_item_info, 'lxml': extract_item_info}
+
+
+def measure(parser_name, fixture_path):
+    # Runs in a fresh interpreter so ru_maxrss reflects this parser alone, C allocations included
+    with open(fixture_path) as file:
+        page_source = file.read()
+    parse = PARSERS[parser_name]
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        items = parse(page_source)
+    elapsed = (time.perf_counter() - start) / REPEAT
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss
+    print(f"{parser_name},{len(items)},{elapsed:.6f},{peak_rss}")
+
+
+def run(fixture_path):
+    with open(fixture_path) as file:
+        page_source = file.read()
+    identical = bs4_extract_item_info(page_source) == extract_item_info(page_source)
+    print(f"{fixture_path}: {len(page_source)} bytes, identical output={identical}")
+    for parser_name in PARSERS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_parser', '--measure', parser_name, fixture_path],
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+        _, cards, elapsed, peak_rss = output.split(',')
+        print(f"  {parser_name:>5}: {cards} cards, {float(elapsed) * 1000:8.2f} ms/page, peak RSS +{int(peak_rss) / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--measure']:
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        for fixture_path in sys.argv[1:] or ['tests/unit/sample.html']:
+            run(fixture_path)
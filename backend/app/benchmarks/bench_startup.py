@@ -0,0 +1,52 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPEAT = 5
+
+# What a run pays before its first request: module imports plus creating the AWS clients
+STARTUP = {
+    'import src.app': "import src.app",
+    'import + clients': "import src.app as app; app.get_s3(); app.get_sns()",
+}
+
+
+def import_times(statement):
+    # -X importtime reports cumulative microseconds per module on stderr; the last line is the top-level import
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        check=True, capture_output=True, text=True, env={**os.environ, 'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-west-2')}
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def wall_time(statement):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', statement], check=True,
+                   env={**os.environ, 'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-west-2')})
+    return time.perf_counter() - start
+
+
+def run():
+    for name, statement in STARTUP.items():
+        walls = [wall_time(statement) for _ in range(REPEAT)]
+        print(f"{name:>18}: {statistics.median(walls) * 1000:7.0f} ms wall (median of {REPEAT})")
+
+    times = import_times("import src.app")
+    heavy = ['selenium', 'undetected_chromedriver', 'fake_useragent', 'pandas', 'pyarrow', 'requests', 'boto3', 'lxml.html']
+    print("  loaded by 'import src.app':")
+    for module in heavy:
+        loaded = f"{times[module] / 1000:7.1f} ms" if module in times else "    not imported"
+        print(f"    {module:>24}: {loaded}")
+
+
+if __name__ == "__main__":
+    run()
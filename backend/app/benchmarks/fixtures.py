@@ -0,0 +1,70 @@
+import gzip
+import os
+import random
+
+from lxml import etree, html
+
+from src.listing_parser import PRODUCT_CARDS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+SAMPLE_PAGE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'unit', 'sample.html')
+
+
+def _synthetic_id(n):
+    return f"H{n:06d}CKBN"
+
+
+def build_listing(card_count, sample_page=SAMPLE_PAGE):
+    """Expand the captured listing page to card_count product cards.
+
+    Cards are copied round-robin from the real page with their ids rewritten,
+    so the markup around each card is exactly what the scraper sees in prod.
+    """
+    with open(sample_page) as file:
+        document = html.document_fromstring(file.read())
+
+    cards = PRODUCT_CARDS(document)
+    grid = cards[0].getparent()
+    templates = [(card.get('id').replace('grid-product-', ''), etree.tostring(card, encoding='unicode', method='html'))
+                 for card in cards]
+    for card in cards:
+        grid.remove(card)
+
+    for n in range(card_count):
+        item_id, markup = templates[n % len(templates)]
+        new_id = _synthetic_id(n)
+        markup = markup.replace(item_id, new_id).replace(item_id[1:], new_id[1:])
+        grid.append(html.fragment_fromstring(markup))
+
+    return etree.tostring(document, encoding='unicode', method='html')
+
+
+def listing_fixture(card_count):
+    # Generated once and cached, since the 10k-card page takes a few seconds to build
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"listing_{card_count}.html.gz")
+    if not os.path.exists(path):
+        with gzip.open(path, 'wt', encoding='utf-8') as file:
+            file.write(build_listing(card_count))
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        return file.read()
+
+
+def synthetic_history_rows(row_count, run_size=1000, start_timestamp=1716163200, seed=0):
+    """Yield (timestamp, rows) runs totalling row_count inventory rows, 10 minutes apart."""
+    rng = random.Random(seed)
+    catalog = [{'item_id': _synthetic_id(n), 'price': str(rng.randint(1000, 50000))} for n in range(run_size * 2)]
+    for run in range((row_count + run_size - 1) // run_size):
+        timestamp = start_timestamp + run * 600
+        listed = rng.sample(catalog, min(run_size, row_count - run * run_size))
+        yield timestamp, [{
+            'uuid': f"{item['item_id']}{timestamp}",
+            'item_id': item['item_id'],
+            'timestamp': str(timestamp),
+            'title': 'Steeple 25 bag',
+            'color': 'Multi-colored',
+            'url': f"/au/en/product/steeple-25-bag-{item['item_id']}/",
+            'price': item['price'],
+            's3_image_url': f"s3://bench-bucket/{item['item_id']}.jpg",
+            'available': 'True'
+        } for item in listed]
@@ -0,0 +1,156 @@
+"""Offline benchmarks for the scrape-to-CSV path.
+
+Every stage runs against local fixtures, with S3 and SNS stubbed by moto:
+
+    python -m benchmarks.run                       # 100/1k/10k cards, 10k-1M history rows
+    python -m benchmarks.run --history 10000000    # add the 10M-row history
+    python -m benchmarks.run --save-baseline       # record results as the new baseline
+
+Results are written to benchmarks/results/<utc time>.json and compared with
+benchmarks/baseline.json when it exists; the exit status is 1 on regression.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import boto3
+from moto import mock_aws
+
+from benchmarks.fixtures import listing_fixture, synthetic_history_rows
+from src.inventory_store import build_csv_rows, compact_partitions, partition_date, rows_to_csv, partition_key, write_partition
+from src.listing_parser import extract_item_info
+from src.manifest import load_manifest, save_manifest
+from src.notify import find_new_items, format_new_items_message
+
+BENCHMARK_DIR = os.path.dirname(__file__)
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'baseline.json')
+BUCKET_NAME = 'bench-bucket'
+RUN_TIMESTAMP = 1716163200 + 7 * 86400
+
+# Timings below this are dominated by noise, so they never count as regressions
+MIN_COMPARABLE_SECONDS = 0.005
+
+
+def measure(fn, *args):
+    # tracemalloc sees Python allocations only; libxml2 memory used by lxml is not included
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'seconds': round(elapsed, 6), 'peak_bytes': peak}
+
+
+def load_history(s3, row_count):
+    s3.create_bucket(Bucket=BUCKET_NAME, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+    last_run = (0, [])
+    for timestamp, rows in synthetic_history_rows(row_count):
+        s3.put_object(Bucket=BUCKET_NAME, Key=partition_key(timestamp), Body=rows_to_csv(rows).encode('utf-8'))
+        last_run = (timestamp, rows)
+    save_manifest(s3, BUCKET_NAME, last_run[0], (row['item_id'] for row in last_run[1]))
+    return last_run[0]
+
+
+def diff(s3, items):
+    manifest = load_manifest(s3, BUCKET_NAME)
+    return find_new_items(items, manifest['item_ids'] if manifest else set())
+
+
+def persist(s3, items):
+    csv_rows = build_csv_rows(items, [None] * len(items), RUN_TIMESTAMP)
+    write_partition(s3, BUCKET_NAME, RUN_TIMESTAMP, csv_rows)
+    save_manifest(s3, BUCKET_NAME, RUN_TIMESTAMP, (item['item_id'] for item in items))
+
+
+def notify(sns, topic_arn, new_items):
+    message = format_new_items_message(new_items)
+    sns.publish(TopicArn=topic_arn, Subject="New Items Added", Message=message[:200000])
+    return message
+
+
+def run(card_counts, history_sizes):
+    results = {'parse': {}, 'diff': {}, 'notify': {}, 'persist': {}, 'compact': {}}
+
+    # Parsing and formatting only depend on how many cards a page has
+    parsed = {}
+    for card_count in card_counts:
+        page_source = listing_fixture(card_count)
+        parsed[card_count], results['parse'][str(card_count)] = measure(extract_item_info, page_source)
+
+    for row_count in history_sizes:
+        with mock_aws():
+            s3 = boto3.client('s3', region_name='us-west-2')
+            sns = boto3.client('sns', region_name='us-west-2')
+            topic_arn = sns.create_topic(Name='bench-topic')['TopicArn']
+            last_timestamp = load_history(s3, row_count)
+
+            for card_count, items in parsed.items():
+                size = f"{card_count}x{row_count}"
+                new_items, results['diff'][size] = measure(diff, s3, items)
+                _, results['notify'][size] = measure(notify, sns, topic_arn, new_items)
+                _, results['persist'][size] = measure(persist, s3, items)
+
+            # Compaction is offline and bounded by one day of runs, whatever the total history
+            _, results['compact'][str(row_count)] = measure(compact_partitions, s3, BUCKET_NAME, partition_date(last_timestamp))
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for stage, sizes in results.items():
+        for size, current in sizes.items():
+            previous = baseline.get(stage, {}).get(size)
+            if not previous or max(current['seconds'], previous['seconds']) < MIN_COMPARABLE_SECONDS:
+                continue
+            for metric in ('seconds', 'peak_bytes'):
+                if previous[metric] and current[metric] > previous[metric] * threshold:
+                    regressions.append(f"{stage}[{size}] {metric}: {previous[metric]} -> {current[metric]}")
+    return regressions
+
+
+def report(results):
+    for stage, sizes in results.items():
+        for size, measurement in sizes.items():
+            print(f"{stage:>8} {size:>14}: {measurement['seconds'] * 1000:10.2f} ms  peak {measurement['peak_bytes'] / 2 ** 20:8.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--history', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--threshold', type=float, default=1.25, help="ratio over baseline that counts as a regression")
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+    results = run(args.cards, args.history)
+    report(results)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_path = os.path.join(RESULTS_DIR, f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(results_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {results_path}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
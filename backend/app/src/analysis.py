@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+
+def _run_positions(starts):
+    # Index of each element within its run, given a boolean mask of run starts
+    index = np.arange(len(starts))
+    return index - np.maximum.accumulate(np.where(starts, index, 0))
+
+
+def mark_new_items(df):
+    """Vectorized equivalent of the row-wise mark_new_items in manual.ipynb.
+
+    An item is new at a snapshot when it was not marked new in the previous
+    snapshot, which makes an item that stays listed alternate between new and
+    not new. Within the first snapshot only its first row is new. Returns a
+    copy sorted by timestamp with 'is_new' set to '1' or '0' like the notebook.
+    """
+    df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+    if df.empty:
+        return df.assign(is_new=pd.Series(dtype=object))
+
+    item_codes, _ = pd.factorize(df['item_id'])
+    _, snapshot = np.unique(df['timestamp'].to_numpy(), return_inverse=True)
+
+    order = np.lexsort((snapshot, item_codes))
+    sorted_items = item_codes[order]
+    sorted_snapshots = snapshot[order]
+
+    same_item = np.r_[False, sorted_items[1:] == sorted_items[:-1]]
+    duplicate = same_item & np.r_[False, sorted_snapshots[1:] == sorted_snapshots[:-1]]
+
+    # Collapse duplicate (item, snapshot) rows before walking presence runs
+    pair_items = sorted_items[~duplicate]
+    pair_snapshots = sorted_snapshots[~duplicate]
+    pair_same_item = np.r_[False, pair_items[1:] == pair_items[:-1]]
+    consecutive = pair_same_item & np.r_[False, pair_snapshots[1:] == pair_snapshots[:-1] + 1]
+    pair_new = _run_positions(~consecutive) % 2 == 0
+
+    sorted_new = pair_new[np.cumsum(~duplicate) - 1]
+    # The first snapshot compares against itself, so repeated rows there are not new
+    sorted_new &= ~(duplicate & (sorted_snapshots == 0))
+
+    is_new = np.empty(len(df), dtype=bool)
+    is_new[order] = sorted_new
+    return df.assign(is_new=np.where(is_new, '1', '0'))
+
+
+def first_last_seen(df):
+    return (
+        df.groupby('item_id', sort=True)['timestamp']
+        .agg(first_seen='min', last_seen='max', observations='size')
+        .reset_index()
+    )
+
+
+def daily_new_items(df):
+    # Mirrors the notebook's clean-up: keep new rows, one per item per day
+    df = df[df['is_new'] == '1'].copy()
+    timestamps = df['timestamp']
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps, unit='s')
+    df['date'] = timestamps.dt.date
+    return df.drop_duplicates(subset=['item_id', 'date'])
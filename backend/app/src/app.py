@@ -1,400 +1,297 @@
-import csv
-from io import BytesIO, StringIO
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 import os
-import time
 import boto3
-import requests
-from bs4 import BeautifulSoup
-from boto3.dynamodb.conditions import Key
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
 
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver import ActionChains
-from fake_useragent import UserAgent
-from botocore.exceptions import ClientError
-import undetected_chromedriver as uc
 
 import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from typing import Union
+# Only modules every run needs are imported here; selenium, Chrome and pandas load on the paths that use them
+from . import sql_store
+from .dashboard import export_run
+from .events import apply_events, compact_events, diff_items, rebuild_state, write_events
+from .http_fetch import FETCH_MODE, fetch_with_http, make_session
+from .images import ImageMirror, load_known_images, rebuild_known_images, save_known_images
+from .inventory_store import (
+    build_csv_rows, compact_partitions, partition_date, read_last_run, read_last_run_from_csv, write_partition
+)
+from .manifest import fingerprint_items, load_manifest, save_manifest
+from .metrics import Metrics
+from .notify import find_new_items, publish_new_items
+
+# Browsers at once; each Chrome may grow to MAX_DRIVER_RSS_MB, so raise this only with the task's memory
+FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '1'))
+WRITE_SNAPSHOTS = os.environ.get('WRITE_SNAPSHOTS', 'true').lower() not in ('0', 'false', 'no')
+DASHBOARD_EXPORT = os.environ.get('DASHBOARD_EXPORT', 'true').lower() not in ('0', 'false', 'no')
+SQL_STORE_PATH = os.environ.get('SQL_STORE_PATH')
+if SQL_STORE_PATH and sql_store.sqlite3.sqlite_version_info < sql_store.MIN_SQLITE_VERSION:
+    # Rejected once here rather than failing quietly on every run
+    logger.warning("SQL_STORE_PATH ignored: SQLite %s is older than the store needs", sql_store.sqlite3.sqlite_version)
+    SQL_STORE_PATH = None
+
+
+# Clients are created on first use, so importing the module costs no endpoint or credential resolution
+@lru_cache(maxsize=None)
+def get_s3():
+    return boto3.client('s3')
+
+
+@lru_cache(maxsize=None)
+def get_sns():
+    return boto3.client('sns')
+
+
+@contextmanager
+def counting_bytes_read(s3, metrics):
+    # Every read of a run (manifest, image index, event log, shards, compaction) is a GetObject on this client
+    def count(parsed, **kwargs):
+        metrics.incr('bytes_read', parsed.get('ContentLength', 0), 'Bytes')
+
+    s3.meta.events.register('after-call.s3.GetObject', count, unique_id='bytes_read')
+    try:
+        yield
+    finally:
+        s3.meta.events.unregister('after-call.s3.GetObject', unique_id='bytes_read')
 
-sns = boto3.client('sns')
-s3 = boto3.client('s3')
 
-def wait_for_frame(driver, timeout, selector):
+def main():
+    metrics = Metrics.from_env()
     try:
-        frame = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-        )
-        driver.switch_to.frame(frame)
-        return True
-    except (TimeoutException, NoSuchElementException):
-        return False
+        with metrics.span('run'), counting_bytes_read(get_s3(), metrics):
+            run(metrics)
+    finally:
+        metrics.emit()
 
-def main():
+def run(metrics):
+    s3 = get_s3()
     s3_bucket_name = os.environ['S3_BUCKET_NAME']
     sns_topic_arn = os.environ['SNS_TOPIC_ARN']
-    ua = UserAgent()
-    user_agent = ua.random
-
-    options = uc.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=2560,1440")
-    options.add_argument(f'user-agent={user_agent}')
-
-    driver = uc.Chrome(options=options, use_subprocess=True)
-
     api_gateway_urls = [
         # 'https://' + os.environ['API_GATEWAY_REGION1'] + '.execute-api.' + os.environ['AWS_REGION'] + '.amazonaws.com/prod/',
         os.environ['API_GATEWAY_URL'],
         # os.environ['SECOND_API_GATEWAY_URL']
         'https://fu5te2nc0l.execute-api.ap-southeast-2.amazonaws.com/prod/'
-    ]
+    ] + [url for url in os.environ.get('EXTRA_URLS', '').split(',') if url]
     
     timestamp = int(datetime.now().timestamp())
-    items = []
-
-    for url in api_gateway_urls:
-        try:
-            print(f"Fetching response from {url}")
 
-            # Sign request with SigV4
-            region = url.split('.')[2]
-            request = AWSRequest(method='GET', url=url, headers={'Content-Type': 'application/json'})
-            credentials = boto3.Session().get_credentials()
-            SigV4Auth(credentials, 'execute-api', region).add_auth(request)
-            signed_headers = dict(request.headers.items())
+    # The previous run and the image index are read while the pages load, and images of items
+    # the previous run did not list are mirrored page by page as they are parsed
+    with ThreadPoolExecutor(max_workers=2) as prefetch, \
+            ImageMirror(s3, s3_bucket_name, prefetch.submit(get_known_images, s3_bucket_name).result) as image_mirror:
+        last_run_future = prefetch.submit(get_last_run, s3_bucket_name)
 
-            # Set the signed headers
-            driver.execute_cdp_cmd("Network.enable", {})
-            driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": signed_headers})
-
-            driver.get(url)
-
-            screenshot = driver.get_screenshot_as_png()
-            screenshot_key = f"screenshots/{timestamp}.png"
+        def mirror_new_items(page_items):
+            # Items from the previous run wait for record_run, so an unchanged listing starts no downloads
             try:
-                s3.upload_fileobj(
-                    BytesIO(screenshot),
-                    s3_bucket_name,
-                    screenshot_key,
-                    ExtraArgs={'ContentType': 'image/png'}
-                )
-                print(f"Successfully uploaded screenshot to s3://{s3_bucket_name}/{screenshot_key}")
-            except Exception as e:
-                print(f"Failed to upload screenshot: {e}")
-            
-            # Check for CAPTCHA
-            if check_and_solve_captcha(driver):
-                print("CAPTCHA solved successfully")
-            else:
-                print("No CAPTCHA detected or unable to solve")
-
-            page_source = driver.page_source
-            print(f"Page source length: {len(page_source)}")
-
-            if "Blocked" not in page_source:
-                soup = BeautifulSoup(page_source, 'html.parser')
-                items.extend(extract_item_info(soup))
-            else:
-                print(f"Error fetching response from {url}: Request unsuccessful")
-        except Exception as e:
-            print(f"Error fetching response from {url}: {e}")
-    
-    driver.quit()
+                last_run_items = last_run_future.result()['item_ids']
+            except Exception:
+                # The run reports this itself when it reads the last run
+                last_run_items = set()
+            image_mirror.submit([item for item in page_items if item['item_id'] not in last_run_items])
+
+        with metrics.span('fetch'):
+            results = fetch_all(api_gateway_urls, s3_bucket_name, timestamp, metrics, on_items=mirror_new_items)
+        # Merge in URL order, so dedup below resolves overlaps the same way every run
+        items = [item for url in api_gateway_urls for item in results.get(url, [])]
+
+        unique_items = list({item['item_id']: item for item in items}.values())
+        metrics.incr('items_parsed', len(items))
+        metrics.incr('unique_items', len(unique_items))
+        if len(unique_items) == 0:
+            print("No items found")
+            return
+
+        with metrics.span('state_read'):
+            last_run = last_run_future.result()
+        record_run(s3_bucket_name, sns_topic_arn, timestamp, unique_items, last_run, image_mirror, metrics)
+
+def record_run(s3_bucket_name, sns_topic_arn, timestamp, unique_items, last_run, image_mirror, metrics):
+    s3 = get_s3()
+    last_run_timestamp, last_run_items = last_run['timestamp'], last_run['item_ids']
+    print(f"Last run timestamp: {last_run_timestamp}")
 
-    unique_items = {item['item_id']: item for item in items}.values()
-    if len(unique_items) == 0:
-        print("No items found")
+    # Most runs see the same listing, so an unchanged one only records that it was checked
+    fingerprint = fingerprint_items(unique_items)
+    if fingerprint == last_run.get('fingerprint'):
+        print("Listing unchanged since last run")
+        metrics.incr('runs_unchanged')
+        # Nothing new was submitted during the fetch, so no image is downloaded again, even one that keeps failing
+        with metrics.span('persist'):
+            save_manifest(s3, s3_bucket_name, **{**last_run, 'checked_at': timestamp})
+        compact_previous_day(s3_bucket_name, last_run, timestamp, metrics)
         return
 
-    csv_file_name = 'hermes_inventory.csv'
-    csv_content = get_csv_from_s3(s3_bucket_name, csv_file_name)
-    last_run_timestamp = get_last_run_timestamp(csv_content)
-    print(f"Last run timestamp: {last_run_timestamp}")
-
-    new_items = []
-    csv_rows = []
-
-    if csv_content:
-        reader = csv.DictReader(StringIO(csv_content))
-        csv_rows = list(reader)
-
-    last_run_items = {row['item_id'] for row in csv_rows if int(row['timestamp']) == last_run_timestamp}
-
-    for item in unique_items:
-        item_id = item['item_id']
-        title = item['title']
-        color = item['color']
-        url = item['url']
-        price = item['price']
-        unavailable = item['unavailable']
-        image_url = item.get('image_url')
-
-        if not unavailable and item_id not in last_run_items:
-            new_items.append(item)
-
-        # Download and upload image to S3
-        if image_url:
-            object_key = f"{item_id}.jpg"
-            s3_url = download_and_upload_to_s3(image_url, s3_bucket_name, object_key)
-        else:
-            s3_url = None
-
-        csv_rows.append({
-            'uuid': f"{item_id}{timestamp}",
-            'item_id': item_id,
-            'timestamp': str(timestamp),
-            'title': title,
-            'color': color,
-            'url': url,
-            'price': price,
-            's3_image_url': s3_url,
-            'available': str(not unavailable)
-        })
-        print(f"Added item {item_id} to CSV with S3 image URL: {s3_url}, Available: {not unavailable}")
-
-    # Write updated CSV to S3
-    output = StringIO()
-    fieldnames = ['uuid', 'item_id', 'timestamp', 'title', 'color', 'url', 'price', 's3_image_url', 'available']
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(csv_rows)
-
-    put_csv_to_s3(s3_bucket_name, csv_file_name, output.getvalue())
-
-    if new_items:
-        new_items_message = "\n\n".join([f"{item['title']} - {item['color']} - {item['price']}\nhttps://hermes.com{item['url']}" for item in new_items])
+    new_items = find_new_items(unique_items, last_run_items)
+    metrics.incr('new_items', len(new_items))
+
+    state = last_run.get('state')
+    if state is None:
+        with metrics.span('state_rebuild'):
+            state = rebuild_state(s3, s3_bucket_name) or {}
+    events = diff_items(state, unique_items, timestamp)
+    for event in events:
+        metrics.incr(f"events_{event['type']}")
+    apply_events(state, events)
+
+    # The dashboard keeps the notebook's rule: new when not flagged new in the previous run
+    last_new_ids = set(last_run.get('new_ids', ()))
+    dashboard_items = [item for item in unique_items if item['item_id'] not in last_new_ids]
+
+    # New items were mirrored during the fetch; the previous run's items start here and are mostly index hits
+    with metrics.span('image_mirror'):
+        s3_urls = finish_image_mirror(s3_bucket_name, image_mirror, unique_items, metrics)
+
+    with metrics.span('persist'):
+        events_key, events_size = write_events(s3, s3_bucket_name, timestamp, events)
+        if events_key:
+            print(f"Wrote {len(events)} events to s3://{s3_bucket_name}/{events_key}")
+            metrics.incr('bytes_written', events_size, 'Bytes')
+
+        csv_rows = build_csv_rows(unique_items, s3_urls, timestamp)
+        # Full snapshots are kept for the notebook and history tooling until they read the event log
+        if WRITE_SNAPSHOTS:
+            partition_key, partition_size = write_partition(s3, s3_bucket_name, timestamp, csv_rows)
+            print(f"Wrote {len(csv_rows)} rows to s3://{s3_bucket_name}/{partition_key}")
+            metrics.incr('bytes_written', partition_size, 'Bytes')
+
+        save_manifest(s3, s3_bucket_name, timestamp, (item['item_id'] for item in unique_items),
+                      fingerprint=fingerprint, checked_at=timestamp, state=state,
+                      new_ids=sorted(item['item_id'] for item in dashboard_items))
+
+    # Everything derived from the persisted run is independent, so it runs side by side with the notification
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        timeseries = executor.submit(update_timeseries, s3_bucket_name, events, metrics) if events else None
+        if SQL_STORE_PATH:
+            executor.submit(update_sql_store, timestamp, csv_rows, metrics)
+        if DASHBOARD_EXPORT:
+            executor.submit(export_dashboard, s3_bucket_name, timestamp, dashboard_items, metrics)
+
+        def compact():
+            # Compaction deletes event objects, so it waits until the time-series update has read the log
+            if timeseries:
+                timeseries.result()
+            compact_previous_day(s3_bucket_name, last_run, timestamp, metrics)
+        executor.submit(compact)
+
+        if new_items:
+            with metrics.span('notify'):
+                publish_new_items(get_sns(), sns_topic_arn, new_items)
+
+def update_timeseries(bucket_name, events, metrics):
+    with metrics.span('timeseries'):
         try:
-            response = sns.publish(
-                TopicArn=sns_topic_arn,
-                Subject="New Items Added",
-                Message=f"The following new items have been added:\n{new_items_message}"
-            )
-            print(f"SNS publish response: {response}\n\n{new_items_message}")
+            # numpy is only loaded by runs that changed something
+            from .timeseries import update_index
+            metrics.incr('bytes_written', update_index(get_s3(), bucket_name, events)[1], 'Bytes')
         except Exception as e:
-            print(f"Error publishing to SNS: {str(e)}")
-
-def extract_item_info(soup):
-    items = []
-    for div in soup.find_all('div', class_='product-grid-list-item'):
-        item_id = div['id'].replace('grid-product-', '')
-        title = div.find('span', class_='product-item-name').text.strip()
-        color = div.find('span', class_='product-item-colors').text.split(':')[-1].strip()
-        url = div.find('a')['href']
-        price = int(div.find('span', class_='price').text.replace('AU$', '').replace(',', ''))
-        unavailable = 'Unavailable' in div.text
-        
-        # Extract image URL
-        img_tag = div.find('img')
-        image_url = img_tag['src'] if img_tag else None
-        
-        items.append({
-            'item_id': item_id,
-            'title': title,
-            'color': color,
-            'url': url,
-            'price': price,
-            'unavailable': unavailable,
-            'image_url': image_url
-        })
-    return items
-
-def download_and_upload_to_s3(image_url, bucket_name, object_key):
-    # First, check if the object already exists
-    try:
-        s3.head_object(Bucket=bucket_name, Key=object_key)
-        print(f"Object {object_key} already exists in bucket {bucket_name}. Skipping upload.")
-        return f"s3://{bucket_name}/{object_key}"
-    except ClientError as e:
-        if e.response['Error']['Code'] == '404':
-            # The object does not exist, proceed with download and upload
-            response = requests.get(image_url)
-            if response.status_code == 200:
-                s3.upload_fileobj(
-                    BytesIO(response.content),
-                    bucket_name,
-                    object_key,
-                    ExtraArgs={'ContentType': response.headers['Content-Type']}
-                )
-                print(f"Successfully uploaded {object_key} to bucket {bucket_name}")
-                return f"s3://{bucket_name}/{object_key}"
-            else:
-                print(f"Failed to download image from {image_url}")
-                return None
-        else:
-            # Something else went wrong
-            print(f"Error checking object existence: {e}")
-            return None
-        
-
-def wait_for_frame(driver, timeout, selector):
-    try:
-        WebDriverWait(driver, timeout).until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, selector)))
-        return True
-    except TimeoutException:
-        return False
-
-def solve_captcha(chrome):
-    try:
-        # Wait for the CAPTCHA iframe to be present
-        captcha_iframe_selector = "iframe[src^='https://geo.captcha-delivery.com/captcha/']"
-        WebDriverWait(chrome, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, captcha_iframe_selector)))
-        
-        # Switch to the CAPTCHA iframe
-        captcha_iframe = chrome.find_element(By.CSS_SELECTOR, captcha_iframe_selector)
-        chrome.switch_to.frame(captcha_iframe)
-        
-        # Wait for the CAPTCHA to be interactive
-        WebDriverWait(chrome, 20).until(EC.presence_of_element_located((By.ID, "captcha-container")))
-        
-        # Check for different types of CAPTCHAs
-        if chrome.find_elements(By.CLASS_NAME, "geetest_canvas_slice"):
-            print("Detected slider CAPTCHA")
-            # Implement slider CAPTCHA solving logic here
-        elif chrome.find_elements(By.CLASS_NAME, "geetest_item_wrap"):
-            print("Detected image selection CAPTCHA")
-            # Implement image selection CAPTCHA solving logic here
-        else:
-            print("Unknown CAPTCHA type, looking for submit button")
-            submit_button = WebDriverWait(chrome, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit']"))
-            )
-            submit_button.click()
-
-        
-        diagnose_captcha(chrome)
-        
-        # Wait for CAPTCHA verification
-        time.sleep(5)
-        
-        # Check if CAPTCHA was solved successfully
-        if "https://www.hermes.com" in chrome.current_url:
-            print("CAPTCHA solved successfully")
-            return True
-        else:
-            print("CAPTCHA solution unsuccessful")
-            return False
-        
-    except Exception as e:
-        print(f"Error solving CAPTCHA: {str(e)}")
-        return False
-    finally:
-        # Switch back to the default content
-        chrome.switch_to.default_content()
+            print(f"Error updating time-series index: {e}")
 
+def update_sql_store(timestamp, csv_rows, metrics):
+    # Opt-in, for tasks with a persistent volume; elsewhere the store is synced from the partitions
+    with metrics.span('sql_store'):
+        try:
+            conn = sql_store.connect(SQL_STORE_PATH)
+            with conn:
+                sql_store.insert_run(conn, timestamp, csv_rows)
+            conn.close()
+        except Exception as e:
+            print(f"Error updating SQL store: {e}")
 
-def get_csv_from_s3(bucket_name, file_name):
-    try:
-        response = s3.get_object(Bucket=bucket_name, Key=file_name)
-        return response['Body'].read().decode('utf-8')
-    except s3.exceptions.NoSuchKey:
-        return None
+def export_dashboard(bucket_name, timestamp, dashboard_items, metrics):
+    with metrics.span('dashboard'):
+        try:
+            metrics.incr('dashboard_items', export_run(get_s3(), bucket_name, timestamp, dashboard_items))
+        except Exception as e:
+            print(f"Error exporting dashboard data: {e}")
 
-def put_csv_to_s3(bucket_name, file_name, csv_content):
-    s3.put_object(Bucket=bucket_name, Key=file_name, Body=csv_content.encode('utf-8'))
+def fetch_all(urls, s3_bucket_name, timestamp, metrics, on_items=None):
+    # on_items is called from the fetch threads with each page's items as soon as it is parsed
+    results = {}
 
-def get_last_run_timestamp(csv_content):
-    if not csv_content:
-        return 0
-    reader = csv.DictReader(StringIO(csv_content))
-    timestamps = [int(row['timestamp']) for row in reader if row['timestamp'].isdigit()]
-    return max(timestamps) if timestamps else 0
+    def fetch_http(url):
+        page_items = fetch_with_http(session, url, metrics)
+        if page_items is not None and on_items:
+            on_items(page_items)
+        return page_items
 
-def diagnose_captcha(chrome):
+    # Plain signed HTTP first; only pages without a product grid need a browser
+    if FETCH_MODE != 'browser':
+        session = make_session(len(urls))
+        try:
+            with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+                for url, page_items in zip(urls, executor.map(fetch_http, urls)):
+                    if page_items is not None:
+                        results[url] = page_items
+        finally:
+            session.close()
+
+    pending = [url for url in urls if url not in results]
+    if not pending or FETCH_MODE == 'http':
+        return results
+
+    # Chrome and selenium are only imported on runs that need a browser
+    from .browser_fetch import fetch_with_browser
+    results.update(fetch_with_browser(pending, get_s3(), s3_bucket_name, timestamp, metrics, FETCH_CONCURRENCY, on_items))
+    return results
+
+def get_known_images(bucket_name):
+    # Without a readable index every image falls back to its own HEAD check, as before the index existed
+    s3 = get_s3()
     try:
-        logger.info("Starting CAPTCHA diagnosis")
-        
-        # Check for Datadome script
-        datadome_script = chrome.find_elements(By.XPATH, "//script[contains(@src, 'datadome')]")
-        if datadome_script:
-            logger.info("Datadome script detected")
-        
-        # Look for the CAPTCHA iframe
-        captcha_iframe = chrome.find_elements(By.CSS_SELECTOR, "iframe[src*='captcha-delivery']")
-        if captcha_iframe:
-            logger.info(f"CAPTCHA iframe found: {captcha_iframe[0].get_attribute('src')}")
-            
-            # Switch to the iframe and inspect its contents
-            chrome.switch_to.frame(captcha_iframe[0])
-            
-            # Look for specific elements within the CAPTCHA
-            captcha_elements = {
-                "container": chrome.find_elements(By.ID, "captcha-container"),
-                "slider": chrome.find_elements(By.CLASS_NAME, "geetest_slider_button"),
-                "image_select": chrome.find_elements(By.CLASS_NAME, "geetest_item_wrap"),
-                "submit_button": chrome.find_elements(By.CSS_SELECTOR, "button[type='submit']")
-            }
-            
-            for element_name, elements in captcha_elements.items():
-                if elements:
-                    logger.info(f"Found {element_name} in CAPTCHA iframe")
-                else:
-                    logger.info(f"{element_name} not found in CAPTCHA iframe")
-            
-            chrome.switch_to.default_content()
-        else:
-            logger.info("CAPTCHA iframe not found")
-        
-        # Check for any error messages on the page
-        error_messages = chrome.find_elements(By.XPATH, "//*[contains(text(), 'error') or contains(text(), 'Error')]")
-        for error in error_messages:
-            logger.info(f"Possible error message found: {error.text}")
-        
-        # Log the current URL
-        logger.info(f"Current URL: {chrome.current_url}")
-        
-        # Log the page source (be cautious with sensitive information)
-        # logger.debug(f"Page source: {chrome.page_source}")
-        
+        known_images = load_known_images(s3, bucket_name)
+        if known_images is None:
+            known_images = rebuild_known_images(s3, bucket_name)
+        return known_images
     except Exception as e:
-        logger.error(f"Error during CAPTCHA diagnosis: {str(e)}")
+        print(f"Error reading known images index: {e}")
+        return None
 
-def check_and_solve_captcha(driver):
-    try:
-        # Check for Datadome CAPTCHA
-        datadome_frame = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "iframe[src*='captcha-delivery']"))
-        )
-        driver.switch_to.frame(datadome_frame)
-        
-        # Implement Datadome CAPTCHA solving logic here
-        # This is a placeholder and needs to be implemented based on the specific CAPTCHA type
-        print("Attempting to solve Datadome CAPTCHA")
-        time.sleep(5)  # Wait for CAPTCHA to load fully
-        # Add your CAPTCHA solving logic here
-        
-        driver.switch_to.default_content()
-        return True
-    except:
+def finish_image_mirror(bucket_name, image_mirror, items, metrics):
+    # The index is read once and written back once, only when new images were mirrored
+    s3_urls = image_mirror.results(items)
+    # Only real uploads; images a HEAD check found already in S3 are mirrored but not uploaded
+    metrics.incr('images_uploaded', image_mirror.uploaded)
+    known_images = image_mirror.known_images()
+    if known_images is None:
+        # An index that could not be read is not overwritten with this run's images alone
+        return s3_urls
+    mirrored = {url.rsplit('/', 1)[-1] for url in s3_urls if url}
+    metrics.incr('images_known', len(mirrored & known_images))
+    if not mirrored <= known_images:
         try:
-            # Check for reCAPTCHA
-            recaptcha_frame = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "iframe[name^='a-'][src^='https://www.google.com/recaptcha/api2/anchor?']"))
-            )
-            driver.switch_to.frame(recaptcha_frame)
-            
-            # Click on reCAPTCHA checkbox
-            WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//span[@id='recaptcha-anchor']"))).click()
-            
-            driver.switch_to.default_content()
-            return True
-        except:
-            return False
-        
-
+            save_known_images(get_s3(), bucket_name, known_images | mirrored)
+        except Exception as e:
+            print(f"Error saving known images index: {e}")
+    return s3_urls
+
+def compact_previous_day(bucket_name, last_run, timestamp, metrics):
+    # The first run of a new day folds the day of the last write together
+    last_checked = last_run.get('checked_at', last_run['timestamp'])
+    if last_run['timestamp'] and partition_date(last_checked) < partition_date(timestamp):
+        with metrics.span('compact'):
+            try:
+                s3 = get_s3()
+                compact_partitions(s3, bucket_name, partition_date(last_run['timestamp']))
+                compact_events(s3, bucket_name, partition_date(last_run['timestamp']))
+            except Exception as e:
+                print(f"Error compacting partitions: {e}")
+
+def get_last_run(bucket_name):
+    s3 = get_s3()
+    manifest = load_manifest(s3, bucket_name)
+    if manifest:
+        return manifest
+
+    # No manifest yet, so derive it once from the newest partition or the legacy CSV
+    last_run_timestamp, last_run_rows = read_last_run(s3, bucket_name)
+    if not last_run_rows:
+        last_run_timestamp, last_run_rows = read_last_run_from_csv(s3, bucket_name)
+    return {'timestamp': last_run_timestamp, 'item_ids': {row['item_id'] for row in last_run_rows}}
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+from .driver import DriverManager, apply_block_profile
+from .http_fetch import sign_request
+from .listing_parser import extract_item_info
+from .readiness import DATADOME, DATADOME_SELECTOR, GRID, RECAPTCHA, RECAPTCHA_SELECTOR, wait_for_page
+from .screenshots import ScreenshotUploader, capture, screenshot_key, should_capture
+
+def fetch_with_browser(urls, s3, s3_bucket_name, timestamp, metrics, concurrency, on_items=None):
+    # Each concurrent fetch gets its own Chrome, so the cap is sized to the task's memory
+    concurrency = max(1, min(concurrency, len(urls)))
+    driver_manager = DriverManager(size=concurrency, use_subprocess=True)
+    uploader = ScreenshotUploader(s3, s3_bucket_name, metrics)
+
+    def fetch(url):
+        with driver_manager.driver() as driver:
+            page_items = fetch_url(driver, url, uploader, timestamp, metrics)
+        if on_items:
+            on_items(page_items)
+        return page_items
+
+    try:
+        with metrics.span('browser_start'):
+            driver_manager.warm()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = dict(zip(urls, executor.map(fetch, urls)))
+    finally:
+        with metrics.span('browser_quit'):
+            driver_manager.shutdown()
+        uploader.close()
+    return results
+
+def take_screenshot(driver, uploader, url, timestamp, state, metrics):
+    # Capture and encoding happen in Chrome; the upload is left to the uploader's thread
+    try:
+        with metrics.span('screenshot'):
+            body = capture(driver)
+        metrics.incr('screenshots')
+        uploader.submit(screenshot_key(timestamp, url, state), body)
+    except Exception as e:
+        print(f"Failed to capture screenshot: {e}")
+
+def fetch_url(driver, url, uploader, timestamp, metrics):
+    try:
+        print(f"Fetching response from {url}")
+
+        # Set the signed headers and skip resources the parser never looks at
+        apply_block_profile(driver)
+        driver.execute_cdp_cmd("Network.setExtraHTTPHeaders", {"headers": sign_request(url)})
+
+        with metrics.span('page_load'):
+            driver.get(url)
+
+        # Wait once for whichever of grid, challenge frame or block marker shows up first
+        with metrics.span('page_ready'):
+            state = wait_for_page(driver)
+        print(f"Page state: {state}")
+        metrics.incr(f"page_state_{state}")
+
+        if should_capture(timestamp, failed=state != GRID):
+            take_screenshot(driver, uploader, url, timestamp, state, metrics)
+
+        # Only challenged pages pay for CAPTCHA handling
+        if state in (DATADOME, RECAPTCHA):
+            with metrics.span('captcha_wait'):
+                if check_and_solve_captcha(driver, state):
+                    print("CAPTCHA solved successfully")
+                    wait_for_page(driver)
+                else:
+                    print("Unable to solve CAPTCHA")
+
+        page_source = driver.page_source
+        print(f"Page source length: {len(page_source)}")
+        metrics.incr('page_bytes', len(page_source), 'Bytes')
+
+        if "Blocked" not in page_source:
+            with metrics.span('parse'):
+                return extract_item_info(page_source)
+        print(f"Error fetching response from {url}: Request unsuccessful")
+        metrics.incr('pages_blocked')
+    except Exception as e:
+        print(f"Error fetching response from {url}: {e}")
+        metrics.incr('pages_failed')
+        if should_capture(timestamp, failed=True):
+            take_screenshot(driver, uploader, url, timestamp, 'error', metrics)
+    return []
+
+def check_and_solve_captcha(driver, state):
+    try:
+        if state == DATADOME:
+            datadome_frame = driver.find_element(By.CSS_SELECTOR, DATADOME_SELECTOR)
+            driver.switch_to.frame(datadome_frame)
+
+            # Implement Datadome CAPTCHA solving logic here
+            # This is a placeholder and needs to be implemented based on the specific CAPTCHA type
+            print("Attempting to solve Datadome CAPTCHA")
+            try:
+                # Wait for CAPTCHA to load fully, but no longer than it takes
+                WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.ID, "captcha-container")))
+            except TimeoutException:
+                pass
+            # Add your CAPTCHA solving logic here
+            return True
+
+        if state == RECAPTCHA:
+            recaptcha_frame = driver.find_element(By.CSS_SELECTOR, RECAPTCHA_SELECTOR)
+            driver.switch_to.frame(recaptcha_frame)
+
+            # Click on reCAPTCHA checkbox
+            WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//span[@id='recaptcha-anchor']"))).click()
+            return True
+
+        return False
+    except Exception as e:
+        print(f"Error handling CAPTCHA: {e}")
+        return False
+    finally:
+        driver.switch_to.default_content()
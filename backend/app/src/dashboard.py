@@ -0,0 +1,210 @@
+import gzip
+import importlib.util
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+PREFIX = 'dashboard/'
+INDEX_NAME = 'index.json'
+
+
+def read_encoding(value):
+    # Checked once when the config is read, so a bad setting cannot stop the export on every run
+    if value == 'br':
+        if importlib.util.find_spec('brotli'):
+            return value
+        print("DASHBOARD_ENCODING=br needs the brotli package; using gzip")
+        return 'gzip'
+    if value != 'gzip':
+        print(f"Unknown DASHBOARD_ENCODING {value!r}; using gzip")
+    return 'gzip'
+
+
+DASHBOARD_ENCODING = read_encoding(os.environ.get('DASHBOARD_ENCODING', 'gzip'))
+
+# The index changes every run while closed months never do
+INDEX_CACHE_CONTROL = 'public, max-age=60'
+SHARD_CACHE_CONTROL = 'public, max-age=300'
+
+
+def shard_month(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime('%Y-%m')
+
+
+def shard_path(month):
+    return f"new/{month}.json"
+
+
+def day_of(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def to_record(item, timestamp):
+    return {
+        'uuid': f"{item['item_id']}{int(timestamp)}",
+        'item_id': item['item_id'],
+        'timestamp': int(timestamp),
+        'price': int(item['price']),
+        'url': item['url'],
+        'color': item['color'],
+        'title': item['title']
+    }
+
+
+def group_shards(rows):
+    # rows must already be newest first
+    shards = {}
+    for row in rows:
+        shards.setdefault(shard_month(row['timestamp']), []).append(to_record(row, row['timestamp']))
+    return shards
+
+
+def build_shards(df):
+    """Group the notebook's new-item rows into month shards of records, newest first.
+
+    Rows are flagged with mark_new_items and kept once per item per day, which
+    is what the dashboard used to compute in the browser.
+    """
+    # pandas is only needed for full rebuilds, not for the per-run export
+    from .analysis import daily_new_items, mark_new_items
+    new_rows = daily_new_items(mark_new_items(df))
+    return group_shards(new_rows.sort_values('timestamp', ascending=False, kind='stable').to_dict('records'))
+
+
+def build_shards_from_store(conn):
+    # The SQL store's new_items_per_day view holds the same rows, so no history is rescanned
+    return group_shards(conn.execute("SELECT * FROM new_items_per_day ORDER BY timestamp DESC, item_id"))
+
+
+def merge_records(records, new_records):
+    # Keeps the dashboard's one-row-per-item-per-day rule when a run adds to an existing shard
+    seen = {(record['item_id'], day_of(record['timestamp'])) for record in records}
+    added = [record for record in new_records if (record['item_id'], day_of(record['timestamp'])) not in seen]
+    return sorted(records + added, key=lambda record: -record['timestamp']), len(added)
+
+
+def build_index(shard_sizes, timestamp):
+    return {
+        'generated_at': int(timestamp),
+        'shards': [
+            {'month': month, 'path': shard_path(month), 'items': items}
+            for month, items in sorted(shard_sizes.items(), reverse=True)
+        ]
+    }
+
+
+def encode(body, encoding=DASHBOARD_ENCODING):
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def to_json(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def put_json(s3, bucket_name, key, value, cache_control, encoding=DASHBOARD_ENCODING):
+    # Served from S3 through the DashboardDistribution, so the browser decompresses it from Content-Encoding
+    s3.put_object(
+        Bucket=bucket_name,
+        Key=key,
+        Body=encode(to_json(value), encoding),
+        ContentType='application/json',
+        ContentEncoding=encoding,
+        CacheControl=cache_control
+    )
+
+
+def get_json(s3, bucket_name, key):
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None
+    body = response['Body'].read()
+    if response.get('ContentEncoding') == 'br':
+        import brotli
+        body = brotli.decompress(body)
+    elif response.get('ContentEncoding') == 'gzip':
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def export_history(s3, bucket_name, shards, timestamp=None, prefix=PREFIX):
+    # Full rebuild, for backfills and whenever the shard layout changes
+    for month, records in shards.items():
+        put_json(s3, bucket_name, prefix + shard_path(month), records, SHARD_CACHE_CONTROL)
+    index = build_index({month: len(records) for month, records in shards.items()},
+                        timestamp or datetime.now(timezone.utc).timestamp())
+    put_json(s3, bucket_name, prefix + INDEX_NAME, index, INDEX_CACHE_CONTROL)
+    print(f"Exported {sum(len(records) for records in shards.values())} new items in {len(shards)} shards to s3://{bucket_name}/{prefix}")
+    return index
+
+
+def export_run(s3, bucket_name, timestamp, new_items, prefix=PREFIX):
+    """Add one run's new items to its month shard and refresh the index.
+
+    Only the current month's shard is read and rewritten, so the cost of a run
+    does not grow with history.
+    """
+    index = get_json(s3, bucket_name, prefix + INDEX_NAME) or build_index({}, timestamp)
+    month = shard_month(timestamp)
+    key = prefix + shard_path(month)
+    records = get_json(s3, bucket_name, key) or []
+    records, added = merge_records(records, [to_record(item, timestamp) for item in new_items])
+    if added:
+        put_json(s3, bucket_name, key, records, SHARD_CACHE_CONTROL)
+
+    shard_sizes = {shard['month']: shard['items'] for shard in index['shards']}
+    shard_sizes[month] = len(records)
+    index = build_index(shard_sizes, timestamp)
+    put_json(s3, bucket_name, prefix + INDEX_NAME, index, INDEX_CACHE_CONTROL)
+    return added
+
+
+def load_shards(source):
+    # A SQL store (.sqlite/.db) is queried directly; anything else is read as a history CSV
+    if source.endswith(('.sqlite', '.db')):
+        from .sql_store import connect
+        return build_shards_from_store(connect(source))
+    import pandas as pd
+    return build_shards(pd.read_csv(source))
+
+
+def write_local(out_dir, source):
+    # For static hosting next to the app: plain JSON plus precompressed siblings for gzip_static-style serving
+    shards = load_shards(source)
+    files = {shard_path(month): records for month, records in shards.items()}
+    files[INDEX_NAME] = build_index({month: len(records) for month, records in shards.items()},
+                                    datetime.now(timezone.utc).timestamp())
+    for path, value in files.items():
+        target = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        body = to_json(value)
+        with open(target, 'wb') as file:
+            file.write(body)
+        with open(target + '.gz', 'wb') as file:
+            file.write(encode(body, 'gzip'))
+    print(f"Wrote {len(files)} dashboard files from {source} to {out_dir}")
+    return files
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        write_local(sys.argv[2], sys.argv[1])
+    elif len(sys.argv) <= 2:
+        import boto3
+        import pandas as pd
+        from .inventory_store import iter_rows
+        s3 = boto3.client('s3')
+        bucket_name = os.environ['S3_BUCKET_NAME']
+        # Rebuild from a CSV export or SQL store, or from the inventory partitions when none is given
+        if len(sys.argv) == 2:
+            export_history(s3, bucket_name, load_shards(sys.argv[1]))
+        else:
+            df = pd.DataFrame(iter_rows(s3, bucket_name)).astype({'timestamp': 'int64', 'price': 'int64'})
+            export_history(s3, bucket_name, build_shards(df))
+    else:
+        print("Usage: python -m src.dashboard [<history.csv|store.sqlite> [<out_dir>]]")
+        sys.exit(1)
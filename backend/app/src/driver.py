@@ -0,0 +1,205 @@
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+import undetected_chromedriver as uc
+from fake_useragent import UserAgent
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGES_PER_DRIVER = int(os.environ.get('MAX_PAGES_PER_DRIVER', '50'))
+MAX_DRIVER_RSS_MB = int(os.environ.get('MAX_DRIVER_RSS_MB', '350'))
+WINDOW_SIZE = os.environ.get('WINDOW_SIZE', '1280,800')
+
+MEDIA_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*/is/image/*',
+]
+FONT_PATTERNS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+# Analytics and tag managers. No captcha-delivery or datadome host is listed, so challenge scripts and
+# frames still load, but MEDIA_PATTERNS match on every host and also block the challenge's own images
+THIRD_PARTY_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+    '*facebook.com/tr*', '*nr-data.net*', '*newrelic.com*', '*hotjar.com*', '*contentsquare.net*',
+    '*criteo.com*', '*tiktok.com*', '*pinterest.com*', '*snapchat.com*', '*bing.com*',
+]
+
+# The scraper only needs the product-grid DOM and img src attributes, neither of which needs these fetched
+BLOCK_PROFILES = {
+    'none': [],
+    'default': MEDIA_PATTERNS + FONT_PATTERNS + THIRD_PARTY_PATTERNS,
+    'aggressive': MEDIA_PATTERNS + FONT_PATTERNS + THIRD_PARTY_PATTERNS + ['*.css'],
+}
+
+
+def read_block_profile(value):
+    # Checked once at import, so a typo cannot fail every page inside fetch_url
+    if value in BLOCK_PROFILES:
+        return value
+    print(f"Unknown BLOCK_PROFILE {value!r}; using default")
+    return 'default'
+
+
+BLOCK_PROFILE = read_block_profile(os.environ.get('BLOCK_PROFILE', 'default'))
+
+
+def apply_block_profile(driver, profile=BLOCK_PROFILE):
+    patterns = BLOCK_PROFILES[profile]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return patterns
+
+
+@lru_cache(maxsize=None)
+def user_agents():
+    # Loading the dataset is the slow part, so it happens once per process rather than per driver
+    return UserAgent()
+
+
+def build_chrome_options(window_size=WINDOW_SIZE, user_agent=None):
+    options = uc.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument(f"--window-size={window_size}")
+    options.add_argument(f'user-agent={user_agent or user_agents().random}')
+    return options
+
+
+def process_tree_rss_mb(pid):
+    # Chrome spreads a page over renderer and GPU children, so sum the whole tree from /proc
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc') if os.path.isdir('/proc') else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as file:
+                ppid = int(file.read().rsplit(')', 1)[1].split()[1])
+            with open(f'/proc/{entry}/statm') as file:
+                rss[int(entry)] = int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / 2 ** 20
+
+
+class ManagedDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverManager:
+    """Keeps up to `size` Chrome instances warm across runs.
+
+    A driver is health-checked before it is handed out and recycled once it
+    has served max_pages pages or its process tree grows past max_rss_mb.
+    """
+
+    def __init__(self, size=1, options_factory=build_chrome_options, max_pages=MAX_PAGES_PER_DRIVER,
+                 max_rss_mb=MAX_DRIVER_RSS_MB, **chrome_kwargs):
+        self.size = size
+        self.options_factory = options_factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.chrome_kwargs = chrome_kwargs
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.drivers = set()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _start(self):
+        logger.info("Starting Chrome driver")
+        managed = ManagedDriver(uc.Chrome(options=self.options_factory(), **self.chrome_kwargs))
+        with self.lock:
+            self.drivers.add(managed)
+        return managed
+
+    def _quit(self, managed):
+        with self.lock:
+            self.drivers.discard(managed)
+        try:
+            managed.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting Chrome driver: {str(e)}")
+
+    def _rss_mb(self, managed):
+        pid = getattr(managed.driver, 'browser_pid', None)
+        return process_tree_rss_mb(pid) if pid else 0
+
+    def _is_healthy(self, managed):
+        try:
+            return managed.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.warning(f"Chrome driver failed health check: {str(e)}")
+            return False
+
+    def _needs_recycle(self, managed):
+        if managed.pages >= self.max_pages:
+            logger.info(f"Recycling Chrome driver after {managed.pages} pages")
+            return True
+        rss_mb = self._rss_mb(managed)
+        if self.max_rss_mb and rss_mb > self.max_rss_mb:
+            logger.info(f"Recycling Chrome driver at {rss_mb:.0f} MB RSS")
+            return True
+        return False
+
+    def _acquire(self):
+        while True:
+            try:
+                managed = self.idle.get_nowait()
+            except queue.Empty:
+                return self._start()
+            if self._is_healthy(managed):
+                return managed
+            self._quit(managed)
+
+    def warm(self):
+        # Start drivers ahead of the first page so browser startup is not on the request path
+        while len(self.drivers) < self.size and not self.closed:
+            self.idle.put(self._start())
+
+    @contextmanager
+    def driver(self):
+        if self.closed:
+            raise RuntimeError("DriverManager has been shut down")
+        self.slots.acquire()
+        managed = None
+        try:
+            managed = self._acquire()
+            yield managed.driver
+            managed.pages += 1
+        except Exception:
+            # A page that broke the driver should not poison the next run
+            if managed and not self._is_healthy(managed):
+                self._quit(managed)
+                managed = None
+            raise
+        finally:
+            if managed:
+                if self.closed or self._needs_recycle(managed):
+                    self._quit(managed)
+                else:
+                    self.idle.put(managed)
+            self.slots.release()
+
+    def shutdown(self):
+        self.closed = True
+        with self.lock:
+            drivers = list(self.drivers)
+        for managed in drivers:
+            self._quit(managed)
+        while not self.idle.empty():
+            self.idle.get_nowait()
@@ -0,0 +1,128 @@
+import gzip
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import orjson
+
+from .sql_store import insert_table
+
+# Written by the old scraper to track the latest run, not an observation
+SENTINEL_UUID = 'maxtimestamp'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS export_files (
+    path TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    ingested_at INTEGER NOT NULL
+);
+
+-- Parsed rows wait here until every file is in, since is_new depends on the runs before each row
+CREATE TABLE IF NOT EXISTS export_rows (
+    item_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    title TEXT,
+    color TEXT,
+    url TEXT,
+    price INTEGER,
+    available INTEGER,
+    s3_image_url TEXT
+);
+"""
+
+COLUMNS = ('item_id', 'timestamp', 'title', 'color', 'url', 'price', 'available', 's3_image_url')
+
+
+def attribute(item, name):
+    # DynamoDB JSON wraps every value in a single-key type descriptor such as {'S': ...} or {'N': ...}
+    value = item.get(name)
+    if value is None or 'NULL' in value:
+        return None
+    return next(iter(value.values()))
+
+
+def parse_line(line):
+    """Turn one line of a DynamoDB JSON export into a typed row tuple, or None for the sentinel."""
+    item = orjson.loads(line)['Item']
+    if attribute(item, 'uuid') == SENTINEL_UUID:
+        return None
+    price = attribute(item, 'price')
+    available = attribute(item, 'available')
+    if isinstance(available, str):
+        available = available in ('True', 'true', '1')
+    return (
+        attribute(item, 'item_id'),
+        int(attribute(item, 'timestamp')),
+        attribute(item, 'title'),
+        attribute(item, 'color'),
+        attribute(item, 'url'),
+        int(price) if price is not None else None,
+        None if available is None else int(available),
+        attribute(item, 's3_image_url')
+    )
+
+
+def parse_file(path):
+    # Runs in a worker process; export files are bounded in size, so one file's rows fit in memory
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as file:
+        rows = [parse_line(line) for line in file if line.strip()]
+    return path, [row for row in rows if row is not None]
+
+
+def list_export_files(directory):
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith(('.json', '.json.gz'))
+    )
+
+
+def ingested_files(conn):
+    return {row[0] for row in conn.execute("SELECT path FROM export_files")}
+
+
+def stage_file(conn, path, rows):
+    # The rows and the checkpoint commit together, so an interrupted ingest resumes at the next file
+    with conn:
+        conn.executemany(f"INSERT INTO export_rows VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+        conn.execute("INSERT INTO export_files VALUES (?, ?, ?)", (path, len(rows), int(time.time())))
+
+
+def merge_staged(conn):
+    # One set-based insert instead of a Python round trip per run
+    inserted = insert_table(conn, 'export_rows')
+    with conn:
+        conn.execute("DELETE FROM export_rows")
+    return inserted
+
+
+def ingest(conn, directory, workers=None):
+    """Parse every export file under directory in a process pool and load it into the history store.
+
+    Files already checkpointed in export_files are skipped. Returns the
+    number of observations added.
+    """
+    conn.executescript(SCHEMA)
+    done = ingested_files(conn)
+    pending = [path for path in list_export_files(directory) if path not in done]
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(parse_file, path) for path in pending]
+            for future in as_completed(futures):
+                path, rows = future.result()
+                stage_file(conn, path, rows)
+                print(f"Parsed {len(rows)} rows from {path}")
+    return merge_staged(conn)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python -m src.dynamo_export <db> <export_dir> [<workers>]")
+        sys.exit(1)
+    from .sql_store import connect
+    conn = connect(sys.argv[1])
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    print(f"Ingested {ingest(conn, sys.argv[2], workers)} rows from {sys.argv[2]} into {sys.argv[1]}")
@@ -0,0 +1,184 @@
+import json
+from itertools import groupby
+
+from .inventory_store import delete_keys, iter_rows, partition_date
+
+PREFIX = 'events/'
+COMPACTED_NAME = 'compacted.jsonl'
+
+ADDED = 'added'
+REMOVED = 'removed'
+PRICE_CHANGED = 'price_changed'
+AVAILABILITY_CHANGED = 'availability_changed'
+EVENT_TYPES = (ADDED, REMOVED, PRICE_CHANGED, AVAILABILITY_CHANGED)
+
+STATE_FIELDS = ('title', 'color', 'url', 'price', 'unavailable', 'image_url')
+
+
+def item_state(item):
+    return {field: item.get(field) for field in STATE_FIELDS}
+
+
+def diff_items(state, items, timestamp):
+    """Compare a run's items with the last known state and return its change events.
+
+    Only listing, price and availability changes are events; other attributes
+    keep the values they had when the item was added.
+    """
+    timestamp = int(timestamp)
+    events = []
+    current = {item['item_id']: item for item in items}
+    for item_id, item in current.items():
+        previous = state.get(item_id)
+        if previous is None:
+            events.append({'ts': timestamp, 'type': ADDED, 'item_id': item_id, **item_state(item)})
+            continue
+        if int(item['price']) != int(previous['price']):
+            events.append({'ts': timestamp, 'type': PRICE_CHANGED, 'item_id': item_id,
+                           'price': int(item['price']), 'previous_price': int(previous['price'])})
+        if bool(item['unavailable']) != bool(previous['unavailable']):
+            events.append({'ts': timestamp, 'type': AVAILABILITY_CHANGED, 'item_id': item_id,
+                           'unavailable': bool(item['unavailable'])})
+    for item_id in sorted(state.keys() - current.keys()):
+        events.append({'ts': timestamp, 'type': REMOVED, 'item_id': item_id})
+    return events
+
+
+def apply_events(state, events):
+    # Mutates and returns state, so a replay can fold one object after another into it
+    for event in events:
+        item_id = event['item_id']
+        if event['type'] == ADDED:
+            state[item_id] = {field: event.get(field) for field in STATE_FIELDS}
+        elif event['type'] == REMOVED:
+            state.pop(item_id, None)
+        elif event['type'] == PRICE_CHANGED:
+            state[item_id]['price'] = event['price']
+        elif event['type'] == AVAILABILITY_CHANGED:
+            state[item_id]['unavailable'] = event['unavailable']
+    return state
+
+
+def event_key(timestamp):
+    return f"{PREFIX}dt={partition_date(timestamp)}/{int(timestamp)}.jsonl"
+
+
+def events_to_jsonl(events):
+    return ''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in events)
+
+
+def write_events(s3, bucket_name, timestamp, events):
+    # Runs without changes leave no object behind
+    if not events:
+        return None, 0
+    key = event_key(timestamp)
+    body = events_to_jsonl(events).encode('utf-8')
+    s3.put_object(Bucket=bucket_name, Key=key, Body=body, ContentType='application/x-ndjson')
+    return key, len(body)
+
+
+def read_events(s3, bucket_name, key):
+    response = s3.get_object(Bucket=bucket_name, Key=key)
+    return [json.loads(line) for line in response['Body'].iter_lines() if line]
+
+
+def list_event_keys(s3, bucket_name, date=None):
+    prefix = f"{PREFIX}dt={date}/" if date else PREFIX
+    paginator = s3.get_paginator('list_objects_v2')
+    keys = []
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.jsonl'))
+    # Same layout as the inventory partitions: dt=YYYY-MM-DD sorts by day, compacted first within it
+    return sorted(keys, key=lambda key: (key.rsplit('/', 1)[0], not key.endswith(COMPACTED_NAME), key))
+
+
+def iter_events(s3, bucket_name, date=None):
+    for key in list_event_keys(s3, bucket_name, date):
+        yield from read_events(s3, bucket_name, key)
+
+
+def rebuild_state(s3, bucket_name):
+    """Replay the event log into the current {item_id: attributes} state.
+
+    Returns None when the log is empty.
+    """
+    keys = list_event_keys(s3, bucket_name)
+    if not keys:
+        return None
+    state = {}
+    for key in keys:
+        apply_events(state, read_events(s3, bucket_name, key))
+    return state
+
+
+def compact_events(s3, bucket_name, date):
+    keys = list_event_keys(s3, bucket_name, date)
+    compacted_key = f"{PREFIX}dt={date}/{COMPACTED_NAME}"
+    if not keys or keys == [compacted_key]:
+        return None
+
+    # Run objects whose timestamp is already compacted survived an earlier failed delete
+    events, covered = [], set()
+    for key in keys:
+        key_events = read_events(s3, bucket_name, key)
+        if key == compacted_key:
+            covered.update(event['ts'] for event in key_events)
+        else:
+            key_events = [event for event in key_events if event['ts'] not in covered]
+        events.extend(key_events)
+    s3.put_object(Bucket=bucket_name, Key=compacted_key, Body=events_to_jsonl(events).encode('utf-8'),
+                  ContentType='application/x-ndjson')
+
+    delete_keys(s3, bucket_name, [key for key in keys if key != compacted_key])
+    print(f"Compacted {len(keys)} event objects into s3://{bucket_name}/{compacted_key}")
+    return compacted_key
+
+
+def snapshot_row_to_item(row):
+    return {
+        'item_id': row['item_id'],
+        'title': row.get('title'),
+        'color': row.get('color'),
+        'url': row.get('url'),
+        'price': int(row['price']),
+        # Older exports have no availability column, so those rows count as available
+        'unavailable': row.get('available') == 'False',
+        'image_url': row.get('s3_image_url') or None
+    }
+
+
+def snapshot_events(rows):
+    """Yield (timestamp, events) for each run of time-ordered snapshot rows.
+
+    Consecutive snapshots are diffed, so runs without changes yield no events.
+    """
+    state = {}
+    for timestamp, run_rows in groupby(rows, key=lambda row: int(row['timestamp'])):
+        events = diff_items(state, [snapshot_row_to_item(row) for row in run_rows], timestamp)
+        apply_events(state, events)
+        if events:
+            yield timestamp, events
+
+
+def backfill_events(s3, bucket_name):
+    # Diffs consecutive inventory snapshots, so the log covers the history recorded before it existed
+    state, written = {}, 0
+    for timestamp, events in snapshot_events(iter_rows(s3, bucket_name)):
+        apply_events(state, events)
+        write_events(s3, bucket_name, timestamp, events)
+        written += 1
+    print(f"Backfilled {written} event objects into s3://{bucket_name}/{PREFIX}")
+    return state
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import boto3
+    s3 = boto3.client('s3')
+    bucket_name = os.environ['S3_BUCKET_NAME']
+    if sys.argv[1:2] == ['backfill']:
+        backfill_events(s3, bucket_name)
+    else:
+        state = rebuild_state(s3, bucket_name) or {}
+        print(json.dumps(state, indent=2, sort_keys=True))
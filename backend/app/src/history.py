@@ -0,0 +1,105 @@
+import sys
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema([
+    ('uuid', pa.string()),
+    ('item_id', DICTIONARY),
+    ('timestamp', pa.timestamp('s', tz='UTC')),
+    ('title', DICTIONARY),
+    ('color', DICTIONARY),
+    ('url', DICTIONARY),
+    ('price', pa.int32()),
+    ('s3_image_url', pa.string()),
+    ('available', pa.bool_()),
+])
+
+# Both output.csv and hermes_inventory.csv are read with these types; missing columns become nulls
+CSV_TYPES = {
+    'uuid': pa.string(),
+    'item_id': pa.string(),
+    'timestamp': pa.int64(),
+    'title': pa.string(),
+    'color': pa.string(),
+    'url': pa.string(),
+    'price': pa.int32(),
+    's3_image_url': pa.string(),
+    'available': pa.bool_(),
+}
+
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def to_history_table(table):
+    columns = []
+    for field in SCHEMA:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(table.num_rows, field.type))
+        elif field.name == 'timestamp':
+            columns.append(table['timestamp'].cast(pa.int64()).cast(field.type))
+        else:
+            columns.append(table[field.name].cast(field.type))
+    table = pa.Table.from_arrays(columns, schema=SCHEMA)
+    # Rows sorted by time give tight per-row-group min/max statistics for predicate pushdown
+    return table.sort_by('timestamp')
+
+
+def read_csv_table(csv_path):
+    return pacsv.read_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(
+            column_types=CSV_TYPES,
+            true_values=['True', 'true', '1'],
+            false_values=['False', 'false', '0'],
+            strings_can_be_null=True
+        )
+    )
+
+
+def write_history(table, parquet_path):
+    pq.write_table(
+        to_history_table(table),
+        parquet_path,
+        compression='zstd',
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=['item_id', 'title', 'color', 'url']
+    )
+
+
+def convert_csv(csv_path, parquet_path):
+    table = read_csv_table(csv_path)
+    write_history(table, parquet_path)
+    print(f"Converted {table.num_rows} rows from {csv_path} to {parquet_path}")
+    return table.num_rows
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime):
+        return pa.scalar(value if value.tzinfo else value.replace(tzinfo=timezone.utc), pa.timestamp('s', tz='UTC'))
+    return pa.scalar(int(value), pa.int64()).cast(pa.timestamp('s', tz='UTC'))
+
+
+def read_history(parquet_path, columns=None, start=None, end=None):
+    # start is inclusive and end exclusive; both accept epoch seconds or datetimes
+    expression = None
+    if start is not None:
+        expression = pc.field('timestamp') >= _to_timestamp(start)
+    if end is not None:
+        upper = pc.field('timestamp') < _to_timestamp(end)
+        expression = upper if expression is None else expression & upper
+    dataset = ds.dataset(parquet_path, format='parquet', schema=SCHEMA)
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.history <input.csv> <output.parquet>")
+        sys.exit(1)
+    convert_csv(sys.argv[1], sys.argv[2])
@@ -0,0 +1,65 @@
+import os
+
+import boto3
+import requests
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .listing_parser import extract_item_info
+
+FETCH_MODE = os.environ.get('FETCH_MODE', 'auto')
+HTTP_TIMEOUT = 30
+GRID_MARKER = 'product-grid-list-item'
+
+
+def make_session(pool_size=8):
+    # Pooled keep-alive connections, shared by every worker thread of a stage
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def sign_request(url, credentials=None):
+    # Sign request with SigV4 for our API Gateway proxies
+    region = url.split('.')[2]
+    request = AWSRequest(method='GET', url=url, headers={'Content-Type': 'application/json'})
+    credentials = credentials or boto3.Session().get_credentials()
+    SigV4Auth(credentials, 'execute-api', region).add_auth(request)
+    return dict(request.headers.items())
+
+
+def fetch_with_http(session, url, metrics):
+    """Fetch a listing through a signed plain HTTP request and parse it.
+
+    Returns the parsed items, or None when the response has no product grid
+    and the page has to be loaded in Chrome instead.
+    """
+    try:
+        with metrics.span('http_fetch'):
+            response = session.get(url, headers=sign_request(url), timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+
+    metrics.incr('page_bytes', len(response.content), 'Bytes')
+    if response.status_code != 200 or GRID_MARKER not in response.text or "Blocked" in response.text:
+        print(f"HTTP fetch for {url} returned no product grid (status {response.status_code})")
+        metrics.incr('http_fallbacks')
+        return None
+
+    with metrics.span('parse'):
+        items = extract_item_info(response.text)
+    if not items:
+        metrics.incr('http_fallbacks')
+        return None
+    print(f"Fetched {len(items)} items from {url} over HTTP")
+    metrics.incr('pages_http')
+    return items
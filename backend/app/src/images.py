@@ -0,0 +1,155 @@
+import gzip
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from botocore.exceptions import ClientError
+
+from .http_fetch import make_session
+
+IMAGE_CONCURRENCY = int(os.environ.get('IMAGE_CONCURRENCY', '8'))
+IMAGE_TIMEOUT = 15
+KNOWN_IMAGES_KEY = 'known_images.txt.gz'
+
+
+def download_and_upload_to_s3(s3, session, image_url, bucket_name, object_key):
+    """Returns (s3_url, uploaded): s3_url is None on failure, uploaded is False when the object already existed."""
+    # First, check if the object already exists
+    try:
+        s3.head_object(Bucket=bucket_name, Key=object_key)
+        print(f"Object {object_key} already exists in bucket {bucket_name}. Skipping upload.")
+        return f"s3://{bucket_name}/{object_key}", False
+    except ClientError as e:
+        if e.response['Error']['Code'] != '404':
+            # Something else went wrong
+            print(f"Error checking object existence: {e}")
+            return None, False
+
+    # The object does not exist, proceed with download and upload
+    try:
+        response = session.get(image_url, timeout=IMAGE_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"Failed to download image from {image_url}: {e}")
+        return None, False
+    if response.status_code != 200:
+        print(f"Failed to download image from {image_url}")
+        return None, False
+
+    s3.upload_fileobj(
+        BytesIO(response.content),
+        bucket_name,
+        object_key,
+        ExtraArgs={'ContentType': response.headers.get('Content-Type', 'image/jpeg')}
+    )
+    print(f"Successfully uploaded {object_key} to bucket {bucket_name}")
+    return f"s3://{bucket_name}/{object_key}", True
+
+
+def load_known_images(s3, bucket_name, key=KNOWN_IMAGES_KEY):
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None
+    return set(gzip.decompress(response['Body'].read()).decode('utf-8').split())
+
+
+def save_known_images(s3, bucket_name, known_images, key=KNOWN_IMAGES_KEY):
+    # Sorted, newline-separated keys compress to a few bytes per image
+    body = gzip.compress('\n'.join(sorted(known_images)).encode('utf-8'))
+    s3.put_object(Bucket=bucket_name, Key=key, Body=body, ContentType='application/gzip')
+
+
+def rebuild_known_images(s3, bucket_name):
+    # Mirrored images live at the bucket root as <item_id>.jpg
+    paginator = s3.get_paginator('list_objects_v2')
+    known_images = set()
+    for page in paginator.paginate(Bucket=bucket_name, Delimiter='/'):
+        known_images.update(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.jpg'))
+    save_known_images(s3, bucket_name, known_images)
+    print(f"Rebuilt known images index with {len(known_images)} keys")
+    return known_images
+
+
+class ImageMirror:
+    """Mirrors item images on a thread pool as soon as items are submitted.
+
+    known_images is a callable returning the index (or None), so it can be a
+    prefetch that only the mirroring threads wait on. Items are mirrored once
+    per (item_id, image_url), however often they are submitted. uploaded
+    counts the images actually uploaded, not those found by a HEAD check.
+    """
+
+    def __init__(self, s3, bucket_name, known_images=lambda: None, max_workers=IMAGE_CONCURRENCY):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.known_images = known_images
+        self.session = make_session(max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = {}
+        self.uploaded = 0
+        # Fetch threads submit their pages' items concurrently
+        self.lock = threading.Lock()
+
+    def submit(self, items):
+        with self.lock:
+            for item in items:
+                key = (item['item_id'], item.get('image_url'))
+                if key not in self.futures:
+                    self.futures[key] = self.executor.submit(self._mirror, item)
+
+    def _mirror(self, item):
+        if not item.get('image_url'):
+            return None
+        object_key = f"{item['item_id']}.jpg"
+        try:
+            known_images = self.known_images()
+            if known_images is not None and object_key in known_images:
+                return f"s3://{self.bucket_name}/{object_key}"
+            s3_url, uploaded = download_and_upload_to_s3(self.s3, self.session, item['image_url'], self.bucket_name, object_key)
+            if uploaded:
+                with self.lock:
+                    self.uploaded += 1
+            return s3_url
+        except Exception as e:
+            print(f"Error mirroring image for {item['item_id']}: {e}")
+            return None
+
+    def results(self, items):
+        """The S3 URLs in the same order as items, with None for items without a mirrored image."""
+        items = list(items)
+        self.submit(items)
+        return [self.futures[(item['item_id'], item.get('image_url'))].result() for item in items]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def mirror_images(s3, bucket_name, items, max_workers=IMAGE_CONCURRENCY, known_images=None):
+    """Mirror every item's image to S3 concurrently.
+
+    Returns the S3 URLs in the same order as items, with None for items that
+    have no image or whose mirroring failed. Keys already in known_images are
+    trusted without a HEAD request.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ImageMirror(s3, bucket_name, lambda: known_images, max_workers) as image_mirror:
+        return image_mirror.results(items)
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ['rebuild']:
+        print("Usage: python -m src.images rebuild")
+        sys.exit(1)
+    import boto3
+    rebuild_known_images(boto3.client('s3'), os.environ['S3_BUCKET_NAME'])
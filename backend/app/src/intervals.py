@@ -0,0 +1,150 @@
+import json
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .history import read_csv_table
+
+ATTRIBUTES = ['title', 'color', 'url', 'price', 's3_image_url', 'available']
+RUNS_METADATA_KEY = b'runs'
+
+DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+FIELD_TYPES = {
+    'item_id': DICTIONARY,
+    'first_seen': pa.int64(),
+    'last_seen': pa.int64(),
+    'first_run': pa.int32(),
+    'last_run': pa.int32(),
+    'title': DICTIONARY,
+    'color': DICTIONARY,
+    'url': DICTIONARY,
+    'price': pa.int32(),
+    's3_image_url': pa.string(),
+    'available': pa.bool_(),
+}
+
+
+def compact_observations(df):
+    """Collapse per-run observations into (item_id, first_seen, last_seen, attributes) intervals.
+
+    An interval covers consecutive runs in which the item was listed with the
+    same attributes; a gap of one run or any attribute change starts a new one.
+    first_run/last_run index into the returned runs array, the sorted timestamps
+    of every run in the input, which is what presence checks are made against.
+    Repeated rows for an item within one run keep only the first.
+    """
+    attributes = [column for column in ATTRIBUTES if column in df.columns]
+    runs, run_index = np.unique(df['timestamp'].to_numpy(dtype=np.int64), return_inverse=True)
+    df = (
+        df.assign(run=run_index)
+        .sort_values(['item_id', 'run'], kind='stable')
+        .drop_duplicates(['item_id', 'run'])
+        .reset_index(drop=True)
+    )
+    if df.empty:
+        return pd.DataFrame(columns=['item_id', 'first_seen', 'last_seen', 'first_run', 'last_run', *attributes]), runs
+
+    item_id = df['item_id'].to_numpy()
+    run = df['run'].to_numpy()
+    # Attribute tuples are compared through group codes so nulls compare equal to each other
+    attribute_code = df.groupby(attributes, dropna=False, sort=False).ngroup().to_numpy() if attributes else np.zeros(len(df))
+
+    starts = np.r_[True, (item_id[1:] != item_id[:-1]) | (run[1:] != run[:-1] + 1) | (attribute_code[1:] != attribute_code[:-1])]
+    ends = np.r_[starts[1:], True]
+
+    intervals = df.loc[starts, ['item_id', *attributes]].reset_index(drop=True)
+    intervals.insert(1, 'first_run', run[starts])
+    intervals.insert(2, 'last_run', run[ends])
+    intervals.insert(1, 'first_seen', runs[intervals['first_run']])
+    intervals.insert(2, 'last_seen', runs[intervals['last_run']])
+    return intervals, runs
+
+
+def expand_intervals(intervals, runs):
+    # The per-run observation rows the intervals were built from, ordered by timestamp
+    lengths = (intervals['last_run'] - intervals['first_run'] + 1).to_numpy()
+    repeated = intervals.loc[intervals.index.repeat(lengths)].reset_index(drop=True)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    run = repeated['first_run'].to_numpy() + offsets
+    observations = repeated.drop(columns=['first_seen', 'last_seen', 'first_run', 'last_run'])
+    observations.insert(1, 'timestamp', runs[run])
+    observations.insert(0, 'uuid', observations['item_id'] + observations['timestamp'].astype(str))
+    return observations.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+
+def presence_runs(intervals):
+    # Adjacent intervals of one item only differ in attributes, so listing is continuous across them
+    intervals = intervals.sort_values(['item_id', 'first_run'], kind='stable')
+    item_id = intervals['item_id'].to_numpy()
+    first_run = intervals['first_run'].to_numpy()
+    last_run = intervals['last_run'].to_numpy()
+    starts = np.r_[True, (item_id[1:] != item_id[:-1]) | (first_run[1:] != last_run[:-1] + 1)]
+    ends = np.r_[starts[1:], True]
+    return pd.DataFrame({'item_id': item_id[starts], 'first_run': first_run[starts], 'last_run': last_run[ends]})
+
+
+def new_observations(intervals, runs):
+    """The (item_id, timestamp) pairs that mark_new_items flags as new, computed on intervals.
+
+    Within each stretch of consecutive runs an item is new in the first run and
+    then in every second one, which is how the notebook's is_new alternates.
+    """
+    stretches = presence_runs(intervals)
+    counts = ((stretches['last_run'] - stretches['first_run']) // 2 + 1).to_numpy()
+    offsets = 2 * (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    run = np.repeat(stretches['first_run'].to_numpy(), counts) + offsets
+    new = pd.DataFrame({'item_id': np.repeat(stretches['item_id'].to_numpy(), counts), 'timestamp': runs[run]})
+    return new.sort_values(['timestamp', 'item_id'], kind='stable').reset_index(drop=True)
+
+
+def listed_at(intervals, runs, item_id, timestamp):
+    # Listed at T means listed in the latest run at or before T
+    run = np.searchsorted(runs, int(timestamp), side='right') - 1
+    if run < 0:
+        return False
+    item = intervals[intervals['item_id'] == item_id]
+    return bool(((item['first_run'] <= run) & (item['last_run'] >= run)).any())
+
+
+def write_intervals(intervals, runs, parquet_path):
+    fields = [pa.field(name, FIELD_TYPES[name]) for name in intervals.columns]
+    table = pa.Table.from_pandas(intervals, schema=pa.schema(fields), preserve_index=False)
+    # The run timeline lives in the file footer so one file answers presence queries on its own;
+    # runs are ten minutes apart, so the deltas compress to almost nothing
+    deltas = np.diff(runs, prepend=0).tolist()
+    metadata = {RUNS_METADATA_KEY: zlib.compress(json.dumps(deltas, separators=(',', ':')).encode('utf-8'))}
+    pq.write_table(table.replace_schema_metadata(metadata), parquet_path, compression='zstd')
+
+
+def read_intervals(parquet_path):
+    table = pq.read_table(parquet_path)
+    runs = np.cumsum(json.loads(zlib.decompress(table.schema.metadata[RUNS_METADATA_KEY])), dtype=np.int64)
+    intervals = table.to_pandas()
+    for column in intervals.columns:
+        if isinstance(intervals[column].dtype, pd.CategoricalDtype):
+            intervals[column] = intervals[column].astype(object)
+    return intervals, runs
+
+
+def compact_csv(csv_path, parquet_path):
+    df = read_csv_table(csv_path).to_pandas()
+    intervals, runs = compact_observations(df)
+    write_intervals(intervals, runs, parquet_path)
+    print(f"Compacted {len(df)} observations over {len(runs)} runs from {csv_path} into {len(intervals)} intervals in {parquet_path}")
+    return intervals, runs
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == 'compact':
+        compact_csv(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) == 5 and sys.argv[1] == 'listed':
+        intervals, runs = read_intervals(sys.argv[2])
+        print(listed_at(intervals, runs, sys.argv[3], int(sys.argv[4])))
+    else:
+        print("Usage: python -m src.intervals compact <input.csv> <output.parquet>")
+        print("       python -m src.intervals listed <intervals.parquet> <item_id> <timestamp>")
+        sys.exit(1)
@@ -0,0 +1,202 @@
+import csv
+from datetime import datetime, timezone
+from io import StringIO
+
+from .s3_stream import MultipartWriter, open_csv
+
+FIELDNAMES = ['uuid', 'item_id', 'timestamp', 'title', 'color', 'url', 'price', 's3_image_url', 'available']
+PREFIX = 'inventory/'
+COMPACTED_NAME = 'compacted.csv'
+LEGACY_KEY = 'hermes_inventory.csv'
+
+
+def partition_date(timestamp):
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def partition_key(timestamp):
+    return f"{PREFIX}dt={partition_date(timestamp)}/{int(timestamp)}.csv"
+
+
+def build_csv_rows(items, s3_urls, timestamp):
+    return [{
+        'uuid': f"{item['item_id']}{timestamp}",
+        'item_id': item['item_id'],
+        'timestamp': str(timestamp),
+        'title': item['title'],
+        'color': item['color'],
+        'url': item['url'],
+        'price': item['price'],
+        's3_image_url': s3_url,
+        'available': str(not item['unavailable'])
+    } for item, s3_url in zip(items, s3_urls)]
+
+
+def rows_to_csv(rows):
+    output = StringIO()
+    writer = csv.DictWriter(output, fieldnames=FIELDNAMES)
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+def write_partition(s3, bucket_name, timestamp, rows):
+    # One small object per run, so a run's I/O only depends on its own item count
+    key = partition_key(timestamp)
+    body = rows_to_csv(rows).encode('utf-8')
+    s3.put_object(Bucket=bucket_name, Key=key, Body=body, ContentType='text/csv')
+    return key, len(body)
+
+
+def iter_partition(s3, bucket_name, key):
+    yield from open_csv(s3, bucket_name, key) or ()
+
+
+def read_partition(s3, bucket_name, key):
+    return list(iter_partition(s3, bucket_name, key))
+
+
+def list_partition_dates(s3, bucket_name):
+    paginator = s3.get_paginator('list_objects_v2')
+    dates = []
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=PREFIX, Delimiter='/'):
+        for prefix in page.get('CommonPrefixes', []):
+            dates.append(prefix['Prefix'][len(PREFIX):].rstrip('/').replace('dt=', ''))
+    return sorted(dates)
+
+
+def list_partition_keys(s3, bucket_name, date=None):
+    prefix = f"{PREFIX}dt={date}/" if date else PREFIX
+    paginator = s3.get_paginator('list_objects_v2')
+    keys = []
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith('.csv'))
+    # Compacted objects hold the oldest runs of their day, so they sort first within it
+    return sorted(keys, key=lambda key: (key.rsplit('/', 1)[0], not key.endswith(COMPACTED_NAME), key))
+
+
+def iter_rows(s3, bucket_name, date=None):
+    for key in list_partition_keys(s3, bucket_name, date):
+        yield from iter_partition(s3, bucket_name, key)
+
+
+def read_last_run(s3, bucket_name):
+    # Walk back from the newest day until a run object is found
+    for date in reversed(list_partition_dates(s3, bucket_name)):
+        keys = list_partition_keys(s3, bucket_name, date)
+        if not keys:
+            continue
+        rows = read_partition(s3, bucket_name, keys[-1])
+        if not rows:
+            continue
+        last_run_timestamp = max(int(row['timestamp']) for row in rows)
+        return last_run_timestamp, [row for row in rows if int(row['timestamp']) == last_run_timestamp]
+    return 0, []
+
+
+def read_last_run_from_csv(s3, bucket_name, key=LEGACY_KEY):
+    # One streamed pass over a single-file history, holding only the newest run's rows
+    last_run_timestamp, last_run_rows = 0, []
+    for row in open_csv(s3, bucket_name, key) or ():
+        if not row['timestamp'].isdigit():
+            continue
+        timestamp = int(row['timestamp'])
+        if timestamp > last_run_timestamp:
+            last_run_timestamp, last_run_rows = timestamp, []
+        if timestamp == last_run_timestamp:
+            last_run_rows.append(row)
+    return last_run_timestamp, last_run_rows
+
+
+def write_csv(s3, bucket_name, key, rows, fieldnames=FIELDNAMES):
+    # Rows are streamed into a multipart upload, so memory stays at one part whatever the row count
+    with MultipartWriter(s3, bucket_name, key) as output:
+        writer = csv.DictWriter(output, fieldnames=fieldnames, restval='', extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    return output.bytes_written
+
+
+def delete_keys(s3, bucket_name, keys):
+    # delete_objects reports per-key failures in the response instead of raising
+    failed = []
+    for i in range(0, len(keys), 1000):
+        response = s3.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in keys[i:i + 1000]]}
+        )
+        failed.extend(response.get('Errors', []))
+    for error in failed:
+        print(f"Failed to delete s3://{bucket_name}/{error['Key']}: {error.get('Code')} {error.get('Message')}")
+    return [error['Key'] for error in failed]
+
+
+def compact_partitions(s3, bucket_name, date):
+    # Merge every run object of a day into a single compacted object, then drop the sources
+    keys = list_partition_keys(s3, bucket_name, date)
+    compacted_key = f"{PREFIX}dt={date}/{COMPACTED_NAME}"
+    if not keys or keys == [compacted_key]:
+        return None
+
+    # Keys are already in time order, so rows pass straight through; the existing compacted
+    # object is fully read before the new one replaces it when the upload completes
+    covered = set()
+
+    def rows():
+        for key in keys:
+            for row in iter_partition(s3, bucket_name, key):
+                if key == compacted_key:
+                    covered.add(row['timestamp'])
+                # Sources left behind by an interrupted or partly failed delete are already compacted
+                elif row['timestamp'] in covered:
+                    continue
+                yield row
+
+    write_csv(s3, bucket_name, compacted_key, rows())
+    delete_keys(s3, bucket_name, [key for key in keys if key != compacted_key])
+    print(f"Compacted {len(keys)} objects into s3://{bucket_name}/{compacted_key}")
+    return compacted_key
+
+
+def compact_all(s3, bucket_name, before=None):
+    # Only closed days are compacted so an in-progress day keeps its cheap per-run writes
+    before = before or partition_date(datetime.now(timezone.utc).timestamp())
+    return [key for date in list_partition_dates(s3, bucket_name) if date < before
+            for key in [compact_partitions(s3, bucket_name, date)] if key]
+
+
+def rollup_csv(s3, bucket_name, key=LEGACY_KEY):
+    """Bring a single-file CSV history up to date with the partitions.
+
+    The existing object is streamed through unchanged and every partitioned row
+    newer than its last timestamp is appended, so neither side is held in memory.
+    """
+    existing = open_csv(s3, bucket_name, key)
+    state = {'last': 0, 'rows': 0}
+
+    def rows():
+        for row in existing or ():
+            if row['timestamp'].isdigit():
+                state['last'] = max(state['last'], int(row['timestamp']))
+            yield row
+        for date in list_partition_dates(s3, bucket_name):
+            if state['last'] and date < partition_date(state['last']):
+                continue
+            for row in iter_rows(s3, bucket_name, date):
+                if int(row['timestamp']) > state['last']:
+                    state['rows'] += 1
+                    yield row
+
+    size = write_csv(s3, bucket_name, key, rows(), fieldnames=existing.fieldnames if existing else FIELDNAMES)
+    print(f"Appended {state['rows']} rows to s3://{bucket_name}/{key} ({size} bytes)")
+    return state['rows']
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import boto3
+    if sys.argv[1:2] == ['rollup']:
+        rollup_csv(boto3.client('s3'), os.environ['S3_BUCKET_NAME'], *sys.argv[2:3])
+    else:
+        compact_all(boto3.client('s3'), os.environ['S3_BUCKET_NAME'])
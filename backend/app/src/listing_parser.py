@@ -0,0 +1,35 @@
+from lxml import etree, html
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Compiled once at import; every card lookup below is evaluated relative to its product div
+PRODUCT_CARDS = etree.XPath(f"//div[{_has_class('product-grid-list-item')}]")
+ITEM_NAME = etree.XPath(f"string((.//span[{_has_class('product-item-name')}])[1])")
+ITEM_COLORS = etree.XPath(f"string((.//span[{_has_class('product-item-colors')}])[1])")
+ITEM_URL = etree.XPath("(.//a)[1]/@href")
+ITEM_PRICE = etree.XPath(f"string((.//span[{_has_class('price')}])[1])")
+ITEM_IMAGE = etree.XPath("(.//img)[1]/@src")
+ITEM_UNAVAILABLE = etree.XPath("contains(string(.), 'Unavailable')")
+
+
+def parse_card(div):
+    image_url = ITEM_IMAGE(div)
+    return {
+        'item_id': div.get('id').replace('grid-product-', ''),
+        'title': ITEM_NAME(div).strip(),
+        'color': ITEM_COLORS(div).split(':')[-1].strip(),
+        'url': ITEM_URL(div)[0],
+        'price': int(ITEM_PRICE(div).replace('AU$', '').replace(',', '')),
+        'unavailable': ITEM_UNAVAILABLE(div),
+        'image_url': image_url[0] if image_url else None
+    }
+
+
+def extract_item_info(page_source):
+    if not page_source:
+        return []
+    document = html.document_fromstring(page_source)
+    return [parse_card(div) for div in PRODUCT_CARDS(document)]
@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+MANIFEST_KEY = 'inventory/_manifest.json'
+
+
+def fingerprint_items(items):
+    # Only what the inventory history tracks; card order and markup changes do not count
+    state = sorted((item['item_id'], int(item['price']), bool(item['unavailable'])) for item in items)
+    return hashlib.sha256(json.dumps(state, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def load_manifest(s3, bucket_name, key=MANIFEST_KEY):
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None
+    manifest = json.loads(response['Body'].read())
+    manifest['item_ids'] = set(manifest.get('item_ids', []))
+    return manifest
+
+
+def save_manifest(s3, bucket_name, timestamp, item_ids, key=MANIFEST_KEY, **extra):
+    # A single PUT replaces the object atomically, so readers never see a partial manifest
+    manifest = {'timestamp': int(timestamp), 'item_ids': sorted(item_ids), **extra}
+    s3.put_object(
+        Bucket=bucket_name,
+        Key=key,
+        Body=json.dumps(manifest, separators=(',', ':')).encode('utf-8'),
+        ContentType='application/json'
+    )
+    return manifest
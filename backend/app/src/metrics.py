@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+NAMESPACE = 'H52/Scraper'
+
+
+class Metrics:
+    """Per-run stage timings and counters, emitted as one CloudWatch EMF line.
+
+    Spans with the same name accumulate, so a stage that runs once per URL
+    reports its total time across the run (summed over concurrent fetches).
+    """
+
+    def __init__(self, namespace=NAMESPACE, dimensions=None):
+        self.namespace = namespace
+        self.dimensions = dimensions or {'Service': 'scraper'}
+        self.values = {}
+        self.units = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        if os.environ.get('METRICS_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+            return NullMetrics()
+        return cls()
+
+    def incr(self, name, value=1, unit='Count'):
+        # Fetch workers record into the same run, so updates are serialized
+        with self.lock:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.incr(f"{name}_ms", (time.perf_counter() - start) * 1000, 'Milliseconds')
+
+    def summary(self):
+        # Embedded Metric Format: CloudWatch extracts the listed metrics from this log line
+        values = {name: round(value, 3) if isinstance(value, float) else value for name, value in self.values.items()}
+        return {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [list(self.dimensions)],
+                    'Metrics': [{'Name': name, 'Unit': self.units[name]} for name in values]
+                }]
+            },
+            **self.dimensions,
+            **values
+        }
+
+    def emit(self):
+        print(json.dumps(self.summary(), separators=(',', ':')), flush=True)
+
+
+NULL_SPAN = nullcontext()
+
+
+class NullMetrics:
+    def incr(self, name, value=1, unit='Count'):
+        pass
+
+    def span(self, name):
+        return NULL_SPAN
+
+    def summary(self):
+        return {}
+
+    def emit(self):
+        pass
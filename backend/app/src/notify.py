@@ -0,0 +1,23 @@
+def find_new_items(items, last_run_items):
+    # New means listed as available now and absent from the previous run
+    return [item for item in items if not item['unavailable'] and item['item_id'] not in last_run_items]
+
+
+def format_new_items_message(new_items):
+    new_items_message = "\n\n".join([f"{item['title']} - {item['color']} - {item['price']}\nhttps://hermes.com{item['url']}" for item in new_items])
+    return f"The following new items have been added:\n{new_items_message}"
+
+
+def publish_new_items(sns, sns_topic_arn, new_items):
+    message = format_new_items_message(new_items)
+    try:
+        response = sns.publish(
+            TopicArn=sns_topic_arn,
+            Subject="New Items Added",
+            Message=message
+        )
+        print(f"SNS publish response: {response}\n\n{message}")
+        return response
+    except Exception as e:
+        print(f"Error publishing to SNS: {str(e)}")
+        return None
@@ -0,0 +1,44 @@
+import os
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+PAGE_READY_TIMEOUT = float(os.environ.get('PAGE_READY_TIMEOUT', '20'))
+POLL_FREQUENCY = 0.25
+
+GRID = 'grid'
+DATADOME = 'datadome'
+RECAPTCHA = 'recaptcha'
+BLOCKED = 'blocked'
+TIMEOUT = 'timeout'
+
+GRID_SELECTOR = "div.product-grid-list-item"
+DATADOME_SELECTOR = "iframe[src*='captcha-delivery']"
+RECAPTCHA_SELECTOR = "iframe[name^='a-'][src^='https://www.google.com/recaptcha/api2/anchor?']"
+
+# Every outcome is probed in one round trip; the product grid wins when several are present
+PAGE_STATE_SCRIPT = f"""
+if (document.querySelector("{GRID_SELECTOR}")) return "{GRID}";
+if (document.querySelector("{DATADOME_SELECTOR}")) return "{DATADOME}";
+if (document.querySelector("{RECAPTCHA_SELECTOR}")) return "{RECAPTCHA}";
+if (document.readyState === "complete" && document.documentElement.innerHTML.indexOf("Blocked") !== -1) return "{BLOCKED}";
+return null;
+"""
+
+
+def page_state(driver):
+    try:
+        return driver.execute_script(PAGE_STATE_SCRIPT)
+    except WebDriverException:
+        return None
+
+
+def wait_for_page(driver, timeout=PAGE_READY_TIMEOUT):
+    """Wait until the page shows a product grid, a challenge frame or a block marker.
+
+    Returns whichever state appeared first, or TIMEOUT if none did.
+    """
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(page_state)
+    except TimeoutException:
+        return TIMEOUT
@@ -0,0 +1,83 @@
+import csv
+import io
+
+# S3 rejects parts under 5 MiB except the last; 8 MiB keeps at most ~2 parts in memory
+PART_SIZE = 8 * 2 ** 20
+
+
+def open_csv(s3, bucket_name, key):
+    """Read an S3 CSV object row by row without loading the body.
+
+    Returns a csv.DictReader over the streamed body, or None when the object
+    does not exist.
+    """
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None
+    return csv.DictReader(io.TextIOWrapper(response['Body'], encoding='utf-8', newline=''))
+
+
+class MultipartWriter:
+    """Text sink that uploads to S3 in fixed-size multipart parts as it fills.
+
+    Objects smaller than one part go up with a single put_object. The upload
+    is aborted if the with-block raises, so a failed write never replaces the
+    existing object.
+    """
+
+    def __init__(self, s3, bucket_name, key, content_type='text/csv', part_size=PART_SIZE):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.key = key
+        self.content_type = content_type
+        self.part_size = part_size
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+        self.bytes_written = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.buffer += data
+        self.bytes_written += len(data)
+        if len(self.buffer) >= self.part_size:
+            self._upload_part(bytes(self.buffer))
+            self.buffer.clear()
+        return len(text)
+
+    def _upload_part(self, body):
+        if self.upload_id is None:
+            self.upload_id = self.s3.create_multipart_upload(
+                Bucket=self.bucket_name, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        part_number = len(self.parts) + 1
+        response = self.s3.upload_part(
+            Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id, PartNumber=part_number, Body=body
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def close(self):
+        if self.upload_id is None:
+            self.s3.put_object(Bucket=self.bucket_name, Key=self.key, Body=bytes(self.buffer), ContentType=self.content_type)
+        else:
+            if self.buffer:
+                self._upload_part(bytes(self.buffer))
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id, MultipartUpload={'Parts': self.parts}
+            )
+        self.buffer.clear()
+
+    def abort(self):
+        if self.upload_id is not None:
+            self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=self.key, UploadId=self.upload_id)
+        self.buffer.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
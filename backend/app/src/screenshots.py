@@ -0,0 +1,106 @@
+import base64
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .inventory_store import partition_date
+
+PREFIX = 'screenshots/'
+CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+DEFAULT_POLICY = 'failure'
+
+
+def parse_policy(value):
+    """Read a policy into (mode, n): always, never, failure (pages that did not show a
+    product grid) or every:N (about one run in N, plus failures).
+
+    Anything else falls back to the default with a warning, so a typo cannot fail the fetch.
+    """
+    if value in ('always', 'never', 'failure'):
+        return value, None
+    if value.startswith('every:') and value[6:].isdigit() and int(value[6:]) > 0:
+        return 'every', int(value[6:])
+    print(f"Unknown SCREENSHOT_POLICY {value!r}; using {DEFAULT_POLICY}")
+    return DEFAULT_POLICY, None
+
+
+def read_format(value):
+    if value in CONTENT_TYPES:
+        return value
+    print(f"Unknown SCREENSHOT_FORMAT {value!r}; using webp")
+    return 'webp'
+
+
+SCREENSHOT_POLICY = parse_policy(os.environ.get('SCREENSHOT_POLICY', DEFAULT_POLICY))
+SCREENSHOT_FORMAT = read_format(os.environ.get('SCREENSHOT_FORMAT', 'webp'))
+SCREENSHOT_QUALITY = int(os.environ.get('SCREENSHOT_QUALITY', '60'))
+SCREENSHOT_WIDTH = int(os.environ.get('SCREENSHOT_WIDTH', '800'))
+
+
+def should_capture(timestamp, failed, policy=SCREENSHOT_POLICY):
+    mode, every = policy
+    if mode == 'always':
+        return True
+    if mode == 'every':
+        # Sampled from the run's timestamp, so every endpoint of a run agrees without a run counter
+        return failed or zlib.crc32(str(int(timestamp)).encode()) % every == 0
+    return failed and mode == 'failure'
+
+
+def screenshot_key(timestamp, url, state, image_format=SCREENSHOT_FORMAT):
+    # One key per endpoint and path, so concurrent fetches in a run no longer overwrite each other;
+    # EXTRA_URLS share the API Gateway host, so the path is folded in as a short hash
+    parsed = urlparse(url)
+    endpoint = f"{parsed.hostname.split('.')[0]}-{zlib.crc32(parsed.path.encode()):08x}"
+    return f"{PREFIX}dt={partition_date(timestamp)}/{int(timestamp)}-{endpoint}-{state}.{EXTENSIONS[image_format]}"
+
+
+def capture(driver, image_format=SCREENSHOT_FORMAT, quality=SCREENSHOT_QUALITY, width=SCREENSHOT_WIDTH):
+    """Encode the viewport in Chrome as WebP/JPEG/PNG, scaled down to at most width pixels wide."""
+    viewport = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})['cssLayoutViewport']
+    scale = min(1.0, width / viewport['clientWidth'])
+    params = {
+        'format': image_format,
+        'clip': {'x': viewport['pageX'], 'y': viewport['pageY'], 'width': viewport['clientWidth'],
+                 'height': viewport['clientHeight'], 'scale': scale}
+    }
+    if image_format != 'png':
+        params['quality'] = quality
+    return base64.b64decode(driver.execute_cdp_cmd('Page.captureScreenshot', params)['data'])
+
+
+class ScreenshotUploader:
+    """Uploads screenshots on a background thread, so S3 latency stays off the fetch path.
+
+    close() waits for pending uploads; failures are logged and never fail a run.
+    """
+
+    def __init__(self, s3, bucket_name, metrics, image_format=SCREENSHOT_FORMAT, max_workers=2):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.metrics = metrics
+        self.content_type = CONTENT_TYPES[image_format]
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def submit(self, key, body):
+        return self.executor.submit(self._upload, key, body)
+
+    def _upload(self, key, body):
+        try:
+            with self.metrics.span('screenshot_upload'):
+                self.s3.put_object(Bucket=self.bucket_name, Key=key, Body=body, ContentType=self.content_type)
+            print(f"Uploaded screenshot to s3://{self.bucket_name}/{key}")
+            self.metrics.incr('bytes_written', len(body), 'Bytes')
+        except Exception as e:
+            print(f"Failed to upload screenshot: {e}")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,231 @@
+import csv
+import sqlite3
+import sys
+from itertools import groupby
+
+from .inventory_store import iter_rows, list_partition_dates, partition_date
+
+# The views and bulk inserts use window functions
+MIN_SQLITE_VERSION = (3, 25, 0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    timestamp INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    items INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS observations (
+    item_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    title TEXT,
+    color TEXT,
+    url TEXT,
+    price INTEGER,
+    available INTEGER,
+    s3_image_url TEXT,
+    is_new INTEGER NOT NULL,
+    PRIMARY KEY (item_id, timestamp)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS observations_timestamp ON observations (timestamp);
+CREATE INDEX IF NOT EXISTS observations_date ON observations (date, item_id);
+CREATE INDEX IF NOT EXISTS observations_new ON observations (is_new, timestamp);
+
+-- The notebook's output_updated.csv: new rows, the first per item per day
+CREATE VIEW IF NOT EXISTS new_items_per_day AS
+SELECT item_id || timestamp AS uuid, item_id, timestamp, price, url, color, title, is_new, date
+FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY item_id, date ORDER BY timestamp) AS nth
+    FROM observations
+    WHERE is_new = 1
+)
+WHERE nth = 1
+ORDER BY timestamp, item_id;
+
+CREATE VIEW IF NOT EXISTS price_changes AS
+SELECT item_id, timestamp, date, title, color, previous_price, price
+FROM (
+    SELECT *, LAG(price) OVER (PARTITION BY item_id ORDER BY timestamp) AS previous_price
+    FROM observations
+)
+WHERE previous_price IS NOT NULL AND previous_price != price
+ORDER BY timestamp, item_id;
+
+CREATE VIEW IF NOT EXISTS restocks AS
+SELECT item_id, timestamp, date, title, color, price
+FROM (
+    SELECT *, LAG(available) OVER (PARTITION BY item_id ORDER BY timestamp) AS previously_available
+    FROM observations
+)
+WHERE previously_available = 0 AND available = 1
+ORDER BY timestamp, item_id;
+"""
+
+
+def connect(path):
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        # Amazon Linux 2 images (e.g. the python:3.9 Lambda base) ship SQLite 3.7
+        raise RuntimeError(f"The SQL store needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer, "
+                           f"this Python has {sqlite3.sqlite_version}")
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def last_run_timestamp(conn):
+    return conn.execute("SELECT COALESCE(MAX(timestamp), 0) FROM runs").fetchone()[0]
+
+
+def parse_available(row):
+    # Scraped items carry 'unavailable', snapshot rows an 'available' string, the oldest exports neither
+    if 'unavailable' in row:
+        return int(not row['unavailable'])
+    if row.get('available') in (None, ''):
+        return None
+    return int(row['available'] in ('True', 'true', '1', True))
+
+
+def insert_run(conn, timestamp, rows):
+    """Add one run's rows; runs must arrive in time order and repeats are ignored.
+
+    is_new follows the notebook: an item is new unless it was new in the
+    previous run, which only needs that run's new rows.
+    """
+    timestamp = int(timestamp)
+    last = last_run_timestamp(conn)
+    if timestamp <= last:
+        return 0
+    previous_new = {row[0] for row in conn.execute(
+        "SELECT item_id FROM observations WHERE timestamp = ? AND is_new = 1", (last,))}
+    date = partition_date(timestamp)
+    values = [(
+        row['item_id'], timestamp, date, row.get('title'), row.get('color'), row.get('url'),
+        int(row['price']) if row.get('price') not in (None, '') else None, parse_available(row),
+        row.get('s3_image_url') or None, int(row['item_id'] not in previous_new)
+    ) for row in rows]
+    # Repeated rows of an item within a run keep the first, as the notebook's dedup does
+    cursor = conn.executemany("INSERT OR IGNORE INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+    conn.execute("INSERT INTO runs VALUES (?, ?, ?)", (timestamp, date, len(values)))
+    return cursor.rowcount
+
+
+def insert_rows(conn, rows):
+    # Time-ordered rows from any history source, grouped into runs and committed once
+    inserted = 0
+    with conn:
+        for timestamp, run_rows in groupby(rows, key=lambda row: int(row['timestamp'])):
+            inserted += insert_run(conn, timestamp, run_rows)
+    return inserted
+
+
+def insert_table(conn, table):
+    """Bulk version of insert_run for rows already in a table, in any order.
+
+    The table needs the observation columns except date and is_new. Within a
+    streak of consecutive runs an item alternates new/not new, so is_new is
+    the parity of its position in the streak, continuing the store's last run.
+    Runs already in the store are skipped; runs older than its last run are
+    backfilled and is_new is recomputed for the whole store.
+    """
+    last = last_run_timestamp(conn)
+    pending = f"{table}.timestamp NOT IN (SELECT timestamp FROM runs)"
+    earliest = conn.execute(f"SELECT MIN(timestamp) FROM {table} WHERE {pending}").fetchone()[0]
+    if earliest is None:
+        return 0
+    with conn:
+        cursor = conn.execute(f"""
+            INSERT INTO observations
+            WITH numbered AS (
+                SELECT rowid AS id, item_id, DENSE_RANK() OVER (ORDER BY timestamp) AS run,
+                    ROW_NUMBER() OVER (PARTITION BY item_id, timestamp ORDER BY rowid) AS copy
+                FROM {table} WHERE {pending}
+            ), streaks AS (
+                SELECT id, item_id, run, run - ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY run) AS streak
+                FROM numbered
+                WHERE copy = 1
+            ), positions AS (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY item_id, streak ORDER BY run)
+                    + (streak = 0 AND item_id IN (
+                        SELECT item_id FROM observations WHERE timestamp = :last AND is_new = 1)) AS position
+                FROM streaks
+            )
+            -- The windows only sort narrow rows; the wide columns are joined back by rowid
+            SELECT item_id, timestamp, date(timestamp, 'unixepoch'), title, color, url, price, available,
+                   s3_image_url, position % 2
+            FROM positions JOIN {table} ON {table}.rowid = positions.id
+        """, {'last': last})
+        conn.execute(f"""
+            INSERT INTO runs
+            SELECT timestamp, date(timestamp, 'unixepoch'), COUNT(*) FROM {table}
+            WHERE {pending} GROUP BY timestamp
+        """)
+        if earliest < last:
+            recompute_is_new(conn)
+    return cursor.rowcount
+
+
+def recompute_is_new(conn):
+    # Same streak parity as insert_table, over every stored run; only rows whose flag changes are written
+    return conn.execute("""
+        WITH numbered AS (
+            SELECT item_id, timestamp, is_new, DENSE_RANK() OVER (ORDER BY timestamp) AS run FROM observations
+        ), streaks AS (
+            SELECT *, run - ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY run) AS streak FROM numbered
+        ), flags AS (
+            SELECT item_id, timestamp, is_new, ROW_NUMBER() OVER (PARTITION BY item_id, streak ORDER BY run) % 2 AS flag
+            FROM streaks
+        )
+        UPDATE observations SET is_new = 1 - is_new
+        WHERE (item_id, timestamp) IN (SELECT item_id, timestamp FROM flags WHERE flag != is_new)
+    """).rowcount
+
+
+def load_csv(conn, csv_path):
+    # Staged and merged with insert_table, so runs older than the store's newest are backfilled, not dropped
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS csv_rows "
+                 "(item_id, timestamp, title, color, url, price, available, s3_image_url)")
+    try:
+        with open(csv_path, newline='') as file, conn:
+            conn.executemany("INSERT INTO csv_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                (row['item_id'], int(row['timestamp']), row.get('title'), row.get('color'), row.get('url'),
+                 int(row['price']) if row.get('price') not in (None, '') else None, parse_available(row),
+                 row.get('s3_image_url') or None)
+                for row in csv.DictReader(file)))
+        return insert_table(conn, 'csv_rows')
+    finally:
+        with conn:
+            conn.execute("DROP TABLE csv_rows")
+
+
+def sync_from_s3(conn, s3, bucket_name):
+    # Only partitions from the day of the newest stored run onwards are read
+    last = last_run_timestamp(conn)
+    dates = [date for date in list_partition_dates(s3, bucket_name) if not last or date >= partition_date(last)]
+    rows = (row for date in dates for row in iter_rows(s3, bucket_name, date) if int(row['timestamp']) > last)
+    return insert_rows(conn, rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[2] == 'load':
+        conn = connect(sys.argv[1])
+        print(f"Loaded {load_csv(conn, sys.argv[3])} rows from {sys.argv[3]} into {sys.argv[1]}")
+    elif len(sys.argv) == 3 and sys.argv[2] == 'sync':
+        import os
+        import boto3
+        conn = connect(sys.argv[1])
+        print(f"Synced {sync_from_s3(conn, boto3.client('s3'), os.environ['S3_BUCKET_NAME'])} rows into {sys.argv[1]}")
+    elif len(sys.argv) == 4 and sys.argv[2] == 'query':
+        cursor = connect(sys.argv[1]).execute(sys.argv[3])
+        writer = csv.writer(sys.stdout)
+        writer.writerow([column[0] for column in cursor.description])
+        writer.writerows(cursor)
+    else:
+        print("Usage: python -m src.sql_store <db> load <history.csv>")
+        print("       python -m src.sql_store <db> sync")
+        print("       python -m src.sql_store <db> query <sql>")
+        sys.exit(1)
@@ -0,0 +1,223 @@
+import os
+import sys
+from datetime import datetime, timezone
+from io import BytesIO
+
+import numpy as np
+
+from .events import ADDED, AVAILABILITY_CHANGED, PRICE_CHANGED, REMOVED, iter_events, list_event_keys
+
+INDEX_KEY = 'timeseries/index.npz'
+# A point with this price marks the item as no longer listed from its timestamp on
+UNLISTED = -1
+
+
+class TimeSeriesIndex:
+    """Per-item price and availability history as sorted, contiguous arrays.
+
+    Each item owns the slice offsets[i]:offsets[i + 1] of the point arrays,
+    sorted by timestamp. A point is written whenever the item is listed,
+    repriced, restocked or sold out, or unlisted (price UNLISTED), so the
+    index grows with churn rather than with the number of runs.
+    """
+
+    def __init__(self, item_ids, offsets, timestamps, prices, available):
+        self.item_ids = item_ids
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.prices = prices
+        self.available = available
+
+    @classmethod
+    def empty(cls):
+        return cls(np.array([], dtype=str), np.zeros(1, dtype=np.int64), np.array([], dtype=np.int64),
+                   np.array([], dtype=np.int32), np.array([], dtype=bool))
+
+    @classmethod
+    def from_points(cls, item_ids, timestamps, prices, available):
+        unique_ids, codes = np.unique(np.asarray(item_ids, dtype=str), return_inverse=True)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        order = np.lexsort((timestamps, codes))
+        offsets = np.zeros(len(unique_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(unique_ids)), out=offsets[1:])
+        return cls(unique_ids, offsets, timestamps[order], np.asarray(prices, dtype=np.int32)[order],
+                   np.asarray(available, dtype=bool)[order])
+
+    def points(self):
+        # Flat (item_ids, timestamps, prices, available) columns, in index order
+        return (np.repeat(self.item_ids, np.diff(self.offsets)), self.timestamps, self.prices, self.available)
+
+    def append(self, events):
+        """Return a new index with the points of a batch of change events added."""
+        current = {}
+        new_points = []
+        for event in sorted(events, key=lambda event: event['ts']):
+            item_id = event['item_id']
+            if item_id not in current:
+                current[item_id] = self.latest(item_id)
+            price, available = current[item_id] or (UNLISTED, False)
+            if event['type'] == ADDED:
+                price, available = int(event['price']), not event['unavailable']
+            elif event['type'] == PRICE_CHANGED:
+                price = int(event['price'])
+            elif event['type'] == AVAILABILITY_CHANGED:
+                available = not event['unavailable']
+            elif event['type'] == REMOVED:
+                price, available = UNLISTED, False
+            current[item_id] = (price, available)
+            new_points.append((item_id, int(event['ts']), price, available))
+        if not new_points:
+            return self
+
+        item_ids, timestamps, prices, available = self.points()
+        new_ids, new_timestamps, new_prices, new_available = zip(*new_points)
+        return TimeSeriesIndex.from_points(
+            np.concatenate([item_ids, np.array(new_ids, dtype=str)]),
+            np.concatenate([timestamps, new_timestamps]),
+            np.concatenate([prices, new_prices]),
+            np.concatenate([available, new_available])
+        )
+
+    def _slice(self, item_id):
+        position = np.searchsorted(self.item_ids, item_id)
+        if position == len(self.item_ids) or self.item_ids[position] != item_id:
+            return slice(0, 0)
+        return slice(self.offsets[position], self.offsets[position + 1])
+
+    def latest(self, item_id):
+        points = self._slice(item_id)
+        if points.start == points.stop:
+            return None
+        return int(self.prices[points.stop - 1]), bool(self.available[points.stop - 1])
+
+    def history(self, item_id, start=None, end=None):
+        """(timestamp, price, available) points of one item, start inclusive and end exclusive."""
+        points = self._slice(item_id)
+        timestamps = self.timestamps[points]
+        lower = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        upper = len(timestamps) if end is None else np.searchsorted(timestamps, end, side='left')
+        return [(int(t), int(p), bool(a)) for t, p, a in
+                zip(timestamps[lower:upper], self.prices[points][lower:upper], self.available[points][lower:upper])]
+
+    def scan(self, start, end):
+        """Every (item_id, timestamp, price, available) point with start <= timestamp < end."""
+        item_ids, timestamps, prices, available = self.points()
+        mask = (timestamps >= start) & (timestamps < end)
+        order = np.argsort(timestamps[mask], kind='stable')
+        return [(str(i), int(t), int(p), bool(a)) for i, t, p, a in
+                zip(item_ids[mask][order], timestamps[mask][order], prices[mask][order], available[mask][order])]
+
+    def first_seen(self):
+        has_points = np.diff(self.offsets) > 0
+        return self.item_ids[has_points], self.timestamps[self.offsets[:-1][has_points]]
+
+    def first_seen_between(self, start, end):
+        """(item_id, first_seen) of items first listed with start <= first_seen < end, oldest first."""
+        item_ids, first_seen = self.first_seen()
+        mask = (first_seen >= start) & (first_seen < end)
+        order = np.argsort(first_seen[mask], kind='stable')
+        return [(str(i), int(t)) for i, t in zip(item_ids[mask][order], first_seen[mask][order])]
+
+    def to_bytes(self):
+        output = BytesIO()
+        np.savez_compressed(output, item_ids=self.item_ids, offsets=self.offsets, timestamps=self.timestamps,
+                            prices=self.prices, available=self.available)
+        return output.getvalue()
+
+    @classmethod
+    def from_bytes(cls, body):
+        with np.load(BytesIO(body)) as arrays:
+            return cls(arrays['item_ids'], arrays['offsets'], arrays['timestamps'], arrays['prices'], arrays['available'])
+
+
+def build_index(events):
+    return TimeSeriesIndex.empty().append(events)
+
+
+def load_index(s3, bucket_name, key=INDEX_KEY):
+    try:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None
+    return TimeSeriesIndex.from_bytes(response['Body'].read())
+
+
+def save_index(s3, bucket_name, index, key=INDEX_KEY):
+    body = index.to_bytes()
+    s3.put_object(Bucket=bucket_name, Key=key, Body=body, ContentType='application/octet-stream')
+    return len(body)
+
+
+def update_index(s3, bucket_name, events, key=INDEX_KEY):
+    """Fold one run's events into the stored index, building it from the event log the first time.
+
+    Expects the run's events to be in the log already.
+    """
+    index = load_index(s3, bucket_name, key)
+    if index is None:
+        index = build_index(iter_events(s3, bucket_name)) if list_event_keys(s3, bucket_name) else build_index(events)
+    else:
+        index = index.append(events)
+    return index, save_index(s3, bucket_name, index, key)
+
+
+def parse_time(value):
+    # Epoch seconds or an ISO date/datetime, read as UTC when it has no offset
+    if value.isdigit():
+        return int(value)
+    parsed = datetime.fromisoformat(value)
+    return int((parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).timestamp())
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def open_index():
+    # TIMESERIES_PATH points at a local copy; otherwise the index is read from the bucket
+    path = os.environ.get('TIMESERIES_PATH')
+    if path:
+        with open(path, 'rb') as file:
+            return TimeSeriesIndex.from_bytes(file.read())
+    import boto3
+    return load_index(boto3.client('s3'), os.environ['S3_BUCKET_NAME']) or TimeSeriesIndex.empty()
+
+
+USAGE = """Usage: python -m src.timeseries build [<history.csv> <index.npz>]
+       python -m src.timeseries history <item_id> [<start> [<end>]]
+       python -m src.timeseries range <start> <end>
+       python -m src.timeseries first-seen <start> <end>
+Times are epoch seconds or ISO dates (UTC)."""
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else (None, [])
+    if command == 'build' and len(args) == 2:
+        import csv
+        from .events import snapshot_events
+        with open(args[0], newline='') as file:
+            rows = sorted(csv.DictReader(file), key=lambda row: int(row['timestamp']))
+        index = build_index(event for _, events in snapshot_events(rows) for event in events)
+        with open(args[1], 'wb') as file:
+            file.write(index.to_bytes())
+        print(f"Indexed {len(index.timestamps)} points for {len(index.item_ids)} items into {args[1]}")
+    elif command == 'build' and not args:
+        import boto3
+        s3 = boto3.client('s3')
+        bucket_name = os.environ['S3_BUCKET_NAME']
+        index = build_index(iter_events(s3, bucket_name))
+        save_index(s3, bucket_name, index)
+        print(f"Indexed {len(index.timestamps)} points for {len(index.item_ids)} items into s3://{bucket_name}/{INDEX_KEY}")
+    elif command == 'history' and 1 <= len(args) <= 3:
+        bounds = [parse_time(arg) for arg in args[1:]]
+        for timestamp, price, available in open_index().history(args[0], *bounds):
+            print(f"{format_time(timestamp)}  {'unlisted' if price == UNLISTED else price:>8}  {'available' if available else 'unavailable'}")
+    elif command == 'range' and len(args) == 2:
+        for item_id, timestamp, price, available in open_index().scan(*map(parse_time, args)):
+            print(f"{format_time(timestamp)}  {item_id}  {'unlisted' if price == UNLISTED else price:>8}  {'available' if available else 'unavailable'}")
+    elif command == 'first-seen' and len(args) == 2:
+        for item_id, timestamp in open_index().first_seen_between(*map(parse_time, args)):
+            print(f"{format_time(timestamp)}  {item_id}")
+    else:
+        print(USAGE)
+        sys.exit(1)
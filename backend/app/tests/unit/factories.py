@@ -0,0 +1,11 @@
+# Shared test data: a scraped listing item and the inventory CSV row it is stored as
+
+
+def make_item(item_id, price=7300, unavailable=False):
+    return {'item_id': item_id, 'title': 'Steeple 25 bag', 'color': 'Multi-colored', 'url': f'/product/{item_id}/',
+            'price': price, 'unavailable': unavailable, 'image_url': None}
+
+
+def make_row(item_id, timestamp, price='7300', available='True'):
+    return {'uuid': f'{item_id}{timestamp}', 'item_id': item_id, 'timestamp': str(timestamp), 'title': 'Steeple 25 bag',
+            'color': 'Multi-colored', 'url': f'/product/{item_id}/', 'price': price, 's3_image_url': '', 'available': available}
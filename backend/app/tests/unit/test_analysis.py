@@ -0,0 +1,32 @@
+import unittest
+import pandas as pd
+from src.analysis import daily_new_items, first_last_seen, mark_new_items
+
+
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        # A is listed in every snapshot, B drops out and returns, C is duplicated in the first snapshot
+        self.df = pd.DataFrame({
+            'item_id': ['A', 'B', 'C', 'C', 'A', 'A', 'B', 'C', 'A'],
+            'timestamp': [100, 100, 100, 100, 200, 300, 300, 300, 400],
+        })
+
+    def test_mark_new_items(self):
+        result = mark_new_items(self.df.sample(frac=1, random_state=0))
+        marks = dict(zip(zip(result['item_id'], result['timestamp']), result['is_new']))
+
+        self.assertEqual(result['timestamp'].tolist(), sorted(self.df['timestamp']))
+        self.assertEqual([marks[('A', t)] for t in (100, 200, 300, 400)], ['1', '0', '1', '0'])
+        self.assertEqual(marks[('B', 300)], '1')
+        self.assertEqual(sorted(result[result['timestamp'] == 100]['is_new']), ['0', '1', '1', '1'])
+        self.assertEqual(marks[('C', 300)], '1')
+
+    def test_first_last_seen(self):
+        summary = first_last_seen(self.df).set_index('item_id')
+        self.assertEqual(summary.loc['A'].tolist(), [100, 400, 4])
+        self.assertEqual(summary.loc['B'].tolist(), [100, 300, 2])
+
+    def test_daily_new_items(self):
+        daily = daily_new_items(mark_new_items(self.df))
+        self.assertEqual(len(daily), 3)
+        self.assertFalse(daily.duplicated(['item_id', 'date']).any())
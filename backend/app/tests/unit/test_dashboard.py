@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import patch
+import boto3
+import pandas as pd
+from moto import mock_aws
+from src.dashboard import INDEX_NAME, PREFIX, build_shards, export_history, export_run, get_json, read_encoding
+from tests.unit.factories import make_item
+
+
+class TestDashboard(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+        # A is listed in four runs on 31 May and one on 1 June, B only in the third
+        timestamps = [1717113600, 1717114200, 1717114800, 1717115400, 1717200000]
+        self.df = pd.DataFrame([
+            {**make_item('A'), 'uuid': f'A{t}', 'timestamp': t} for t in timestamps
+        ] + [{**make_item('B'), 'uuid': 'B1717114800', 'timestamp': 1717114800}])
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    def test_read_encoding_falls_back_to_gzip(self):
+        with patch('importlib.util.find_spec', return_value=None):
+            self.assertEqual(read_encoding('br'), 'gzip')
+        self.assertEqual(read_encoding('zstd'), 'gzip')
+        self.assertEqual(read_encoding('gzip'), 'gzip')
+
+    def test_build_shards(self):
+        shards = build_shards(self.df)
+        self.assertEqual(sorted(shards), ['2024-05', '2024-06'])
+        # One row per item per day, newest first
+        self.assertEqual([(r['item_id'], r['timestamp']) for r in shards['2024-05']], [('B', 1717114800), ('A', 1717113600)])
+        self.assertEqual([r['item_id'] for r in shards['2024-06']], ['A'])
+
+    def test_export_run_extends_current_shard(self):
+        export_history(self.s3, self.bucket, build_shards(self.df), timestamp=1717200000)
+        self.assertEqual(export_run(self.s3, self.bucket, 1717200600, [make_item('A'), make_item('C')]), 1)
+
+        response = self.s3.get_object(Bucket=self.bucket, Key=PREFIX + INDEX_NAME)
+        self.assertEqual(response['ContentEncoding'], 'gzip')
+        index = get_json(self.s3, self.bucket, PREFIX + INDEX_NAME)
+        self.assertEqual(index['generated_at'], 1717200600)
+        self.assertEqual([(shard['month'], shard['items']) for shard in index['shards']], [('2024-06', 2), ('2024-05', 2)])
+        shard = get_json(self.s3, self.bucket, PREFIX + index['shards'][0]['path'])
+        self.assertEqual([record['item_id'] for record in shard], ['C', 'A'])
@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from src.driver import BLOCK_PROFILES, DriverManager, apply_block_profile, read_block_profile
+
+
+def make_driver():
+    driver = MagicMock()
+    driver.execute_script.return_value = 1
+    driver.browser_pid = None
+    return driver
+
+
+@patch('src.driver.uc.Chrome', side_effect=lambda **kwargs: make_driver())
+class TestDriverManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = DriverManager(options_factory=MagicMock, max_pages=3)
+
+    def tearDown(self):
+        self.manager.shutdown()
+
+    def test_reuses_driver_across_runs(self, mock_chrome):
+        for _ in range(2):
+            with self.manager.driver() as driver:
+                driver.get('https://www.hermes.com/')
+        self.assertEqual(mock_chrome.call_count, 1)
+        driver.quit.assert_not_called()
+
+    def test_recycles_after_max_pages(self, mock_chrome):
+        drivers = []
+        for _ in range(4):
+            with self.manager.driver() as driver:
+                drivers.append(driver)
+        self.assertEqual(mock_chrome.call_count, 2)
+        drivers[0].quit.assert_called_once()
+        self.assertIsNot(drivers[2], drivers[3])
+
+    def test_replaces_unhealthy_driver(self, mock_chrome):
+        with self.manager.driver() as driver:
+            pass
+        driver.execute_script.side_effect = Exception("chrome not reachable")
+        with self.manager.driver() as replacement:
+            pass
+        self.assertIsNot(driver, replacement)
+        driver.quit.assert_called_once()
+
+    def test_recycles_on_memory_growth(self, mock_chrome):
+        self.manager.max_rss_mb = 100
+        with patch('src.driver.process_tree_rss_mb', return_value=400):
+            with self.manager.driver() as driver:
+                driver.browser_pid = 1234
+        driver.quit.assert_called_once()
+
+    def test_shutdown(self, mock_chrome):
+        self.manager.size = 2
+        self.manager.warm()
+        self.assertEqual(mock_chrome.call_count, 2)
+        self.manager.shutdown()
+        self.assertEqual(len(self.manager.drivers), 0)
+        with self.assertRaises(RuntimeError):
+            with self.manager.driver():
+                pass
+
+
+class TestBlockProfile(unittest.TestCase):
+    def test_blocks_media_but_not_challenge_hosts(self):
+        driver = MagicMock()
+        patterns = apply_block_profile(driver, 'default')
+        driver.execute_cdp_cmd.assert_any_call("Network.setBlockedURLs", {"urls": patterns})
+        self.assertIn('*.woff2', patterns)
+        self.assertNotIn('*.css', patterns)
+        # Media patterns are host-agnostic, so challenge images are blocked too; only the hosts stay reachable
+        self.assertIn('*.png', patterns)
+        for pattern in BLOCK_PROFILES['aggressive']:
+            self.assertNotIn('captcha', pattern)
+            self.assertNotIn('datadome', pattern)
+
+    def test_none_clears_blocked_urls(self):
+        driver = MagicMock()
+        apply_block_profile(driver, 'none')
+        driver.execute_cdp_cmd.assert_any_call("Network.setBlockedURLs", {"urls": []})
+
+    def test_read_block_profile_falls_back_to_default(self):
+        self.assertEqual(read_block_profile('aggressive'), 'aggressive')
+        self.assertEqual(read_block_profile('Default'), 'default')
+        self.assertEqual(read_block_profile(''), 'default')
@@ -0,0 +1,54 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from src import dynamo_export, sql_store
+
+
+def export_line(item_id, timestamp, price=7300, uuid=None):
+    item = {
+        'uuid': {'S': uuid or f'{item_id}{timestamp}'},
+        'item_id': {'S': item_id},
+        'timestamp': {'N': str(timestamp)},
+        'price': {'N': str(price)},
+        'url': {'S': f'/product/{item_id}/'},
+        'color': {'S': 'Black'},
+        'title': {'S': 'Bolide 1923 bag'}
+    }
+    return json.dumps({'Item': item}) + '\n'
+
+
+class TestDynamoExport(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        # Runs are split across files out of order, the way an export lays them out
+        with gzip.open(os.path.join(self.dir, 'a.json.gz'), 'wt') as file:
+            file.write(export_line('B', 1717200000) + export_line('A', 1717113600))
+            file.write(export_line('maxtimestamp', 1717200000, uuid='maxtimestamp'))
+        with open(os.path.join(self.dir, 'b.json'), 'w') as file:
+            file.write(export_line('A', 1717200000, price=7500) + '\n')
+        self.conn = sql_store.connect(':memory:')
+
+    def test_parse_line_types_values(self):
+        self.assertEqual(dynamo_export.parse_line(export_line('A', 1717113600)),
+                         ('A', 1717113600, 'Bolide 1923 bag', 'Black', '/product/A/', 7300, None, None))
+        self.assertIsNone(dynamo_export.parse_line(export_line('x', 1, uuid='maxtimestamp')))
+
+    def test_ingest_orders_runs_and_resumes(self):
+        self.assertEqual(dynamo_export.ingest(self.conn, self.dir, workers=2), 3)
+        rows = self.conn.execute("SELECT item_id, timestamp, price, is_new FROM observations ORDER BY timestamp, item_id")
+        self.assertEqual([tuple(row) for row in rows], [('A', 1717113600, 7300, 1), ('A', 1717200000, 7500, 0), ('B', 1717200000, 7300, 1)])
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM export_rows").fetchone()[0], 0)
+
+        with open(os.path.join(self.dir, 'c.json'), 'w') as file:
+            file.write(export_line('C', 1717286400))
+        self.assertEqual(dynamo_export.ingest(self.conn, self.dir, workers=1), 1)
+        self.assertEqual(len(dynamo_export.ingested_files(self.conn)), 3)
+
+    def test_ingest_backfills_a_synced_store(self):
+        sql_store.insert_rows(self.conn, [{'item_id': 'A', 'timestamp': '1717286400', 'price': '7500'}])
+        self.assertEqual(dynamo_export.ingest(self.conn, self.dir, workers=1), 3)
+        rows = self.conn.execute("SELECT item_id, timestamp, is_new FROM observations ORDER BY timestamp, item_id")
+        self.assertEqual([tuple(row) for row in rows],
+                         [('A', 1717113600, 1), ('A', 1717200000, 0), ('B', 1717200000, 1), ('A', 1717286400, 1)])
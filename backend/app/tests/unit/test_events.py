@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+import boto3
+from moto import mock_aws
+from src.events import (
+    ADDED, AVAILABILITY_CHANGED, PRICE_CHANGED, REMOVED, apply_events, backfill_events, compact_events,
+    diff_items, iter_events, list_event_keys, rebuild_state, write_events
+)
+from src.inventory_store import build_csv_rows, write_partition
+from tests.unit.factories import make_item
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    def test_diff_emits_typed_events(self):
+        state = apply_events({}, diff_items({}, [make_item('A'), make_item('B'), make_item('C')], 1716155767))
+        events = diff_items(state, [make_item('A', price=7500), make_item('B', unavailable=True), make_item('D')], 1716156367)
+
+        self.assertEqual([(event['type'], event['item_id']) for event in events], [
+            (PRICE_CHANGED, 'A'), (AVAILABILITY_CHANGED, 'B'), (ADDED, 'D'), (REMOVED, 'C')
+        ])
+        self.assertEqual(events[0]['previous_price'], 7300)
+        self.assertEqual(diff_items(apply_events(state, events), [make_item('A', price=7500), make_item('B', unavailable=True), make_item('D')], 1716156967), [])
+
+    def test_rebuild_state_from_log(self):
+        self.assertIsNone(rebuild_state(self.s3, self.bucket))
+        runs = [
+            (1716155767, [make_item('A'), make_item('B')]),
+            (1716156367, [make_item('A', price=7500), make_item('B')]),
+            (1716242767, [make_item('A', price=7500, unavailable=True)]),
+        ]
+        state = {}
+        for timestamp, items in runs:
+            events = diff_items(state, items, timestamp)
+            apply_events(state, events)
+            write_events(self.s3, self.bucket, timestamp, events)
+
+        compact_events(self.s3, self.bucket, '2024-05-19')
+        self.assertEqual(list_event_keys(self.s3, self.bucket), [
+            'events/dt=2024-05-19/compacted.jsonl', 'events/dt=2024-05-20/1716242767.jsonl'
+        ])
+        rebuilt = rebuild_state(self.s3, self.bucket)
+        self.assertEqual(rebuilt, state)
+        self.assertEqual(rebuilt['A']['price'], 7500)
+        self.assertTrue(rebuilt['A']['unavailable'])
+        self.assertNotIn('B', rebuilt)
+
+    def test_compaction_survives_failed_deletes(self):
+        write_events(self.s3, self.bucket, 1716155767, diff_items({}, [make_item('A')], 1716155767))
+        failed = {'Errors': [{'Key': 'events/dt=2024-05-19/1716155767.jsonl', 'Code': 'InternalError', 'Message': ''}]}
+        with patch.object(self.s3, 'delete_objects', return_value=failed):
+            compact_events(self.s3, self.bucket, '2024-05-19')
+        write_events(self.s3, self.bucket, 1716156367, diff_items({}, [make_item('B')], 1716156367))
+
+        compact_events(self.s3, self.bucket, '2024-05-19')
+
+        self.assertEqual(list_event_keys(self.s3, self.bucket), ['events/dt=2024-05-19/compacted.jsonl'])
+        self.assertEqual([event['item_id'] for event in iter_events(self.s3, self.bucket)], ['A', 'B'])
+
+    def test_backfill_from_snapshots(self):
+        write_partition(self.s3, self.bucket, 1716155767, build_csv_rows([make_item('A'), make_item('B')], [None, None], 1716155767))
+        write_partition(self.s3, self.bucket, 1716156367, build_csv_rows([make_item('A'), make_item('B')], [None, None], 1716156367))
+        write_partition(self.s3, self.bucket, 1716156967, build_csv_rows([make_item('A', price=7500)], [None], 1716156967))
+
+        state = backfill_events(self.s3, self.bucket)
+        # The unchanged middle run produced no events
+        self.assertEqual(list_event_keys(self.s3, self.bucket), [
+            'events/dt=2024-05-19/1716155767.jsonl', 'events/dt=2024-05-19/1716156967.jsonl'
+        ])
+        self.assertEqual(rebuild_state(self.s3, self.bucket), state)
+        self.assertEqual(set(state), {'A'})
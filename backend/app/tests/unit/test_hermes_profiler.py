@@ -1,40 +1,32 @@
+import gzip
 import os
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 import boto3
 from moto import mock_aws
-from functions.hermes_profiler.app import lambda_handler, extract_item_info
-from bs4 import BeautifulSoup
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+
+from src import app
+from src.listing_parser import extract_item_info
+from src.dashboard import get_json
+from src.events import rebuild_state
+from src.manifest import load_manifest
+from src.metrics import Metrics
+from src.inventory_store import iter_rows
 
 class TestHermesProfiler(unittest.TestCase):
     def setUp(self):
         self.mock_aws = mock_aws()
         self.mock_aws.start()
 
-        self.dynamodb = boto3.resource('dynamodb', region_name='us-west-2')
+        self.s3 = boto3.client('s3', region_name='us-west-2')
         self.sns = boto3.client('sns', region_name='us-west-2')
         self.sqs = boto3.client('sqs', region_name='us-west-2')
-        self.table_name = 'test-table'
-        # self.topic_arn = 'arn:aws:sns:us-west-2:123456789012:test-topic'try:
-        try:
-            self.table = self.dynamodb.Table(self.table_name)
-            self.table.delete()
-            self.table.wait_until_not_exists()
-        except self.dynamodb.meta.client.exceptions.ResourceNotFoundException:
-            pass
-
-        self.table = self.dynamodb.create_table(
-            TableName=self.table_name,
-            KeySchema=[
-                {'AttributeName': 'item_id', 'KeyType': 'HASH'},
-                {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
-            ],
-            AttributeDefinitions=[
-                {'AttributeName': 'item_id', 'AttributeType': 'S'},
-                {'AttributeName': 'timestamp', 'AttributeType': 'N'}
-            ],
-            ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
-        )
+        self.bucket_name = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket_name, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
 
         self.topic = self.sns.create_topic(Name='test-topic')
         self.topic_arn = self.topic['TopicArn']
@@ -43,52 +35,227 @@ class TestHermesProfiler(unittest.TestCase):
         self.sns.subscribe(TopicArn=self.topic_arn, Protocol='sqs', Endpoint=self.sqs_arn)
         self.sns.subscribe(TopicArn=self.topic_arn, Protocol='sms', Endpoint="+12223334444")
 
+        # Clients are cached per process, so the moto ones are handed out directly
+        self.patchers = [patch.object(app, 'get_s3', return_value=self.s3), patch.object(app, 'get_sns', return_value=self.sns)]
+        for patcher in self.patchers:
+            patcher.start()
 
     def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
         self.mock_aws.stop()
 
-    @patch('functions.hermes_profiler.app.requests.get')
-    def test_lambda_handler(self, mock_get):
-        # Mock the API Gateway responses
-        mock_get.side_effect = [
-            MagicMock(status_code=200, text='<html><div class="product-grid-list-item" id="grid-product-1"><span class="product-item-name">Item 1</span><span class="product-item-colors">Color: Red</span><a href="/item-1-url">Link</a><span class="price">AU$100</span></div></html>'),
-            MagicMock(status_code=200, text='<html><div class="product-grid-list-item" id="grid-product-2"><span class="product-item-name">Item 2</span><span class="product-item-colors">Color: Blue</span><a href="/item-2-url">Link</a><span class="price">AU$200</span></div></html>')
-        ]
+    def receive_messages(self):
+        response = self.sqs.receive_message(QueueUrl=self.sqs_url, MessageSystemAttributeNames=['All'], MaxNumberOfMessages=10)
+        return response.get("Messages", [])
+
+    @patch('src.app.fetch_with_http', return_value=None)
+    @patch('src.images.make_session')
+    @patch('src.browser_fetch.check_and_solve_captcha', return_value=False)
+    @patch('src.browser_fetch.wait_for_page', return_value='grid')
+    @patch('src.driver.UserAgent')
+    @patch('src.driver.uc.Chrome')
+    def test_main(self, mock_chrome, mock_user_agent, mock_wait_for_page, mock_captcha, mock_make_session, mock_fetch_with_http):
+        # Both API Gateway endpoints return listing pages that overlap on item 2
+        pages = {
+            'https://abc123.execute-api.us-west-2.amazonaws.com/prod/': '<html><div class="product-grid-list-item" id="grid-product-1"><span class="product-item-name">Item 1</span><span class="product-item-colors">Color: Red</span><a href="/item-1-url">Link</a><span class="price">AU$100</span></div>'
+            '<div class="product-grid-list-item" id="grid-product-2"><span class="product-item-name">Item 2</span><span class="product-item-colors">Color: Blue</span><a href="/item-2-url">Link</a><span class="price">AU$200</span></div></html>',
+            'https://fu5te2nc0l.execute-api.ap-southeast-2.amazonaws.com/prod/': '<html><div class="product-grid-list-item" id="grid-product-2"><span class="product-item-name">Item 2</span><span class="product-item-colors">Color: Blue</span><a href="/item-2-url">Link</a><span class="price">AU$200</span></div></html>',
+        }
+        drivers = []
+
+        def make_driver(**kwargs):
+            driver = MagicMock()
+            driver.execute_script.return_value = 1
+            driver.get.side_effect = lambda url: setattr(driver, 'page_source', pages[url])
+            drivers.append(driver)
+            return driver
+
+        mock_chrome.side_effect = make_driver
+        mock_make_session.return_value.get.return_value = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
 
         # Set the necessary environment variables
-        os.environ['DYNAMODB_TABLE'] = self.table_name
-        os.environ['API_GATEWAY_REGION1'] = 'api-gateway-1'
-        os.environ['API_GATEWAY_REGION2'] = 'api-gateway-2'
-        os.environ['AWS_REGION'] = 'us-west-2'
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
         os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
 
-        # Invoke the Lambda handler
-        response = lambda_handler({}, {})
-
-        # Assert the response
-        self.assertEqual(response['statusCode'], 200)
-        self.assertEqual(response['body'], 'Lambda function executed successfully')
+        app.main()
 
-        # Assert that the items are stored in DynamoDB
-        items = self.table.scan()['Items']
-        self.assertEqual(len(items), 2)
-        self.assertEqual(items[0]['item_id'], '1')
-        self.assertEqual(items[1]['item_id'], '2')
+        # Assert that the run's items are stored in the inventory partition
+        rows = list(iter_rows(self.s3, self.bucket_name))
+        self.assertEqual([row['item_id'] for row in rows], ['1', '2'])
+        self.assertEqual(load_manifest(self.s3, self.bucket_name)['item_ids'], {'1', '2'})
+        # One browser by default, reused for both pages
+        self.assertEqual(len(drivers), 1)
+        self.assertEqual(drivers[0].get.call_count, 2)
+        for driver in drivers:
+            driver.quit.assert_called_once()
+        mock_captcha.assert_not_called()
+        # Pages that showed a product grid are not screenshotted under the default policy
+        self.assertNotIn('Contents', self.s3.list_objects_v2(Bucket=self.bucket_name, Prefix='screenshots/'))
 
         # Assert that an SNS notification is sent
-        notifications = self.sns.list_subscriptions_by_topic(TopicArn=self.topic_arn)['Subscriptions']
-        response = self.sqs.receive_message(QueueUrl=self.sqs_url, MessageSystemAttributeNames=['All'], MaxNumberOfMessages=10)
-        messages = response.get("Messages", [])
-
+        messages = self.receive_messages()
         self.assertEqual(len(messages), 1)
+        self.assertIn('Item 1 - Red - 100', messages[0]['Body'])
+
+    @patch('src.app.fetch_with_http')
+    @patch('src.driver.uc.Chrome')
+    def test_main_http_fetch(self, mock_chrome, mock_fetch_with_http):
+        # Signed HTTP responses with a product grid never start a browser
+        mock_fetch_with_http.side_effect = lambda session, url, metrics: [
+            {'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100, 'unavailable': True, 'image_url': None}
+        ]
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+
+        app.main()
+
+        mock_chrome.assert_not_called()
+        rows = list(iter_rows(self.s3, self.bucket_name))
+        self.assertEqual([row['item_id'] for row in rows], ['abc123', 'fu5te2'])
+        self.assertEqual(set(rebuild_state(self.s3, self.bucket_name)), {'abc123', 'fu5te2'})
+        self.assertEqual(get_json(self.s3, self.bucket_name, 'dashboard/index.json')['shards'][0]['items'], 2)
+        self.assertEqual(self.receive_messages(), [])
+
+    @patch('src.app.fetch_with_http')
+    def test_main_unchanged_listing(self, mock_fetch_with_http):
+        # A second run that sees the same listing writes only a manifest heartbeat
+        mock_fetch_with_http.side_effect = lambda session, url, metrics: [
+            {'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100, 'unavailable': True, 'image_url': None}
+        ]
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
 
+        with patch('src.app.write_partition', wraps=app.write_partition) as mock_write_partition:
+            app.main()
+            first_manifest = load_manifest(self.s3, self.bucket_name)
+            app.main()
+
+        mock_write_partition.assert_called_once()
+        manifest = load_manifest(self.s3, self.bucket_name)
+        self.assertEqual(manifest['timestamp'], first_manifest['timestamp'])
+        self.assertEqual(manifest['fingerprint'], first_manifest['fingerprint'])
+        self.assertGreaterEqual(manifest['checked_at'], first_manifest['checked_at'])
+
+    @patch('src.app.fetch_with_http')
+    def test_main_unchanged_listing_skips_images(self, mock_fetch_with_http):
+        # Images that keep failing are retried on changed runs only, not every time the listing is checked
+        mock_fetch_with_http.side_effect = lambda session, url, metrics: [
+            {'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100,
+             'unavailable': False, 'image_url': f'https://assets.hermes.com/{url[8:14]}.jpg'}
+        ]
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+
+        with patch('src.images.make_session') as mock_make_session:
+            mock_make_session.return_value.get.return_value = MagicMock(status_code=403)
+            app.main()
+            self.assertEqual(mock_make_session.return_value.get.call_count, 2)
+            app.main()
+            self.assertEqual(mock_make_session.return_value.get.call_count, 2)
+
+    @patch('src.app.fetch_with_http')
+    def test_main_counts_bytes_read(self, mock_fetch_with_http):
+        # The image index is read from S3, and an image a HEAD check finds already there is not an upload
+        mock_fetch_with_http.side_effect = lambda session, url, metrics: [
+            {'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100,
+             'unavailable': False, 'image_url': f'https://assets.hermes.com/{url[8:14]}.jpg'}
+        ]
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+        self.s3.put_object(Bucket=self.bucket_name, Key='fu5te2.jpg', Body=b'jpeg')
+        self.s3.put_object(Bucket=self.bucket_name, Key='known_images.txt.gz', Body=gzip.compress(b''))
+
+        with patch('src.images.make_session') as mock_make_session:
+            mock_make_session.return_value.get.return_value = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
+            metrics = Metrics()
+            with patch.object(app.Metrics, 'from_env', return_value=metrics):
+                app.main()
+
+        self.assertEqual(metrics.values['images_uploaded'], 1)
+        self.assertGreater(metrics.values['bytes_read'], 0)
+
+    @patch('src.app.fetch_with_http')
+    def test_main_prefetches_state_during_fetch(self, mock_fetch_with_http):
+        # The fetch only completes once the previous run has been read, so the two must overlap
+        state_read = threading.Event()
+        get_last_run = app.get_last_run
+
+        def read_state(bucket_name):
+            try:
+                return get_last_run(bucket_name)
+            finally:
+                state_read.set()
+
+        def fetch(session, url, metrics):
+            self.assertTrue(state_read.wait(5))
+            return [{'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100,
+                     'unavailable': False, 'image_url': f'https://assets.hermes.com/{url[8:14]}.jpg'}]
+
+        mock_fetch_with_http.side_effect = fetch
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+
+        with patch('src.app.get_last_run', side_effect=read_state), patch('src.images.make_session') as mock_make_session:
+            mock_make_session.return_value.get.return_value = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
+            app.main()
+
+        rows = list(iter_rows(self.s3, self.bucket_name))
+        self.assertEqual([row['s3_image_url'] for row in rows], ['s3://test-bucket/abc123.jpg', 's3://test-bucket/fu5te2.jpg'])
+        self.assertEqual(len(self.receive_messages()), 1)
+
+    @patch('src.app.load_known_images', side_effect=Exception('AccessDenied'))
+    @patch('src.app.fetch_with_http')
+    def test_main_unreadable_image_index(self, mock_fetch_with_http, mock_load_known_images):
+        # Images fall back to per-object checks and the run is still persisted
+        mock_fetch_with_http.side_effect = lambda session, url, metrics: [
+            {'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100,
+             'unavailable': False, 'image_url': f'https://assets.hermes.com/{url[8:14]}.jpg'}
+        ]
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+
+        with patch('src.images.make_session') as mock_make_session:
+            mock_make_session.return_value.get.return_value = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
+            app.main()
+
+        rows = list(iter_rows(self.s3, self.bucket_name))
+        self.assertEqual([row['s3_image_url'] for row in rows], ['s3://test-bucket/abc123.jpg', 's3://test-bucket/fu5te2.jpg'])
+        self.assertNotIn('Contents', self.s3.list_objects_v2(Bucket=self.bucket_name, Prefix='known_images'))
+
+    @patch('src.app.fetch_with_http')
+    def test_main_compacts_after_timeseries(self, mock_fetch_with_http):
+        # Compaction deletes the event objects the time-series update may still be reading
+        mock_fetch_with_http.side_effect = lambda session, url, metrics: [
+            {'item_id': url[8:14], 'title': 'Item', 'color': 'Red', 'url': '/item-url', 'price': 100, 'unavailable': True, 'image_url': None}
+        ]
+        os.environ['S3_BUCKET_NAME'] = self.bucket_name
+        os.environ['SNS_TOPIC_ARN'] = self.topic_arn
+        os.environ['API_GATEWAY_URL'] = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+        order = []
+
+        def update_timeseries(*args):
+            time.sleep(0.2)
+            order.append('timeseries')
+
+        with patch('src.app.update_timeseries', side_effect=update_timeseries), \
+                patch('src.app.compact_previous_day', side_effect=lambda *args: order.append('compact')):
+            app.main()
+
+        self.assertEqual(order, ['timeseries', 'compact'])
 
     def test_extract_item_info(self):
         with open("tests/unit/sample.html", "r") as file:
             html = file.read()
-        
-        soup = BeautifulSoup(html, 'html.parser')
-        items = extract_item_info(soup)
+
+        items = extract_item_info(html)
         self.assertEqual(len(items), 14)
         self.assertEqual(items[0]['item_id'], 'H079086CK0Y')
         self.assertEqual(items[0]['title'], 'Lindy mini bag')
@@ -103,4 +270,4 @@ class TestHermesProfiler(unittest.TestCase):
         self.assertEqual(items[6]['color'], 'Multi-colored')
         self.assertEqual(items[6]['url'], '/au/en/product/steeple-25-bag-H083618CKAB/')
         self.assertEqual(items[6]['price'], 7300)
-        self.assertFalse(items[6]['unavailable'])
\ No newline at end of file
+        self.assertFalse(items[6]['unavailable'])
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+import pyarrow as pa
+from src.history import SCHEMA, convert_csv, read_history
+
+OUTPUT_CSV = """uuid,item_id,timestamp,price,url,color,title
+H083618CKAB1716155767,H083618CKAB,1716155767,7300,/au/en/product/steeple-25-bag-H083618CKAB/,Multi-colored,Steeple 25 bag
+H079086CK0Y1716156367,H079086CK0Y,1716156367,11640,/au/en/product/lindy-mini-bag-H079086CK0Y/,Yellow,Lindy mini bag
+H083618CKAB1716156367,H083618CKAB,1716156367,7300,/au/en/product/steeple-25-bag-H083618CKAB/,Multi-colored,Steeple 25 bag
+"""
+
+INVENTORY_CSV = """uuid,item_id,timestamp,title,color,url,price,s3_image_url,available
+H079086CK0Y1716156367,H079086CK0Y,1716156367,Lindy mini bag,Yellow,/au/en/product/lindy-mini-bag-H079086CK0Y/,11640,s3://bucket/H079086CK0Y.jpg,False
+"""
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def test_convert_output_csv(self):
+        parquet_path = os.path.join(self.tmpdir.name, 'output.parquet')
+        self.assertEqual(convert_csv(self.write('output.csv', OUTPUT_CSV), parquet_path), 3)
+
+        table = read_history(parquet_path)
+        self.assertEqual(table.schema, SCHEMA)
+        self.assertEqual(table['price'].to_pylist(), [7300, 11640, 7300])
+        self.assertEqual(table['available'].null_count, 3)
+
+    def test_convert_inventory_csv(self):
+        parquet_path = os.path.join(self.tmpdir.name, 'inventory.parquet')
+        convert_csv(self.write('hermes_inventory.csv', INVENTORY_CSV), parquet_path)
+
+        table = read_history(parquet_path, columns=['item_id', 'available'])
+        self.assertEqual(table.column_names, ['item_id', 'available'])
+        self.assertEqual(table['available'].to_pylist(), [False])
+
+    def test_timestamp_predicate(self):
+        parquet_path = os.path.join(self.tmpdir.name, 'output.parquet')
+        convert_csv(self.write('output.csv', OUTPUT_CSV), parquet_path)
+
+        table = read_history(parquet_path, columns=['item_id'], start=1716156367)
+        self.assertEqual(table['item_id'].to_pylist(), ['H079086CK0Y', 'H083618CKAB'])
+        self.assertEqual(read_history(parquet_path, end=1716156367).num_rows, 1)
+        self.assertIsInstance(table['item_id'].type, pa.DictionaryType)
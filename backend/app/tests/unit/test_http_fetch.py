@@ -0,0 +1,32 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from src.http_fetch import fetch_with_http
+from src.metrics import Metrics
+
+GRID_PAGE = ('<html><div class="product-grid-list-item" id="grid-product-1"><span class="product-item-name">Item 1</span>'
+             '<span class="product-item-colors">Color: Red</span><a href="/item-1-url">Link</a>'
+             '<span class="price">AU$100</span></div></html>')
+
+
+@patch('src.http_fetch.sign_request', return_value={'Authorization': 'AWS4-HMAC-SHA256 ...'})
+class TestHttpFetch(unittest.TestCase):
+    def setUp(self):
+        self.session = MagicMock()
+        self.metrics = Metrics()
+        self.url = 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/'
+
+    def respond(self, status_code, text):
+        self.session.get.return_value = MagicMock(status_code=status_code, text=text, content=text.encode())
+
+    def test_grid_page(self, mock_sign_request):
+        self.respond(200, GRID_PAGE)
+        items = fetch_with_http(self.session, self.url, self.metrics)
+        self.assertEqual([item['item_id'] for item in items], ['1'])
+        self.assertEqual(self.session.get.call_args.kwargs['headers'], mock_sign_request.return_value)
+        self.assertEqual(self.metrics.values['pages_http'], 1)
+
+    def test_falls_back_without_grid(self, mock_sign_request):
+        for status_code, text in [(200, '<html><script>challenge()</script></html>'), (403, GRID_PAGE), (200, GRID_PAGE + 'Blocked')]:
+            self.respond(status_code, text)
+            self.assertIsNone(fetch_with_http(self.session, self.url, self.metrics))
+        self.assertEqual(self.metrics.values['http_fallbacks'], 3)
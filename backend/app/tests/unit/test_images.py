@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import boto3
+from moto import mock_aws
+from src.images import ImageMirror, load_known_images, mirror_images, rebuild_known_images, save_known_images
+
+
+class TestImages(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    @patch('src.images.make_session')
+    def test_mirror_images(self, mock_make_session):
+        session = mock_make_session.return_value
+        session.get.return_value = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
+        self.s3.put_object(Bucket=self.bucket, Key='B.jpg', Body=b'jpeg')
+
+        items = [
+            {'item_id': 'A', 'image_url': 'https://assets.hermes.com/a.jpg'},
+            {'item_id': 'B', 'image_url': 'https://assets.hermes.com/b.jpg'},
+            {'item_id': 'C', 'image_url': None},
+            {'item_id': 'D', 'image_url': 'https://assets.hermes.com/d.jpg'},
+        ]
+        s3_urls = mirror_images(self.s3, self.bucket, items, max_workers=4)
+
+        self.assertEqual(s3_urls, ['s3://test-bucket/A.jpg', 's3://test-bucket/B.jpg', None, 's3://test-bucket/D.jpg'])
+        self.assertEqual(sorted(call.args[0] for call in session.get.call_args_list),
+                         ['https://assets.hermes.com/a.jpg', 'https://assets.hermes.com/d.jpg'])
+        self.assertEqual(self.s3.get_object(Bucket=self.bucket, Key='D.jpg')['ContentType'], 'image/jpeg')
+
+    @patch('src.images.make_session')
+    def test_failed_download(self, mock_make_session):
+        mock_make_session.return_value.get.return_value = MagicMock(status_code=403)
+        self.assertEqual(mirror_images(self.s3, self.bucket, [{'item_id': 'A', 'image_url': 'https://x/a.jpg'}]), [None])
+
+    @patch('src.images.make_session')
+    def test_known_images_skip_head(self, mock_make_session):
+        self.s3.put_object(Bucket=self.bucket, Key='A.jpg', Body=b'jpeg')
+        self.s3.put_object(Bucket=self.bucket, Key='hermes_inventory.csv', Body=b'')
+        known_images = rebuild_known_images(self.s3, self.bucket)
+        self.assertEqual(load_known_images(self.s3, self.bucket), {'A.jpg'})
+
+        with patch.object(self.s3, 'head_object') as mock_head_object:
+            s3_urls = mirror_images(self.s3, self.bucket, [{'item_id': 'A', 'image_url': 'https://x/a.jpg'}],
+                                    known_images=known_images)
+        self.assertEqual(s3_urls, ['s3://test-bucket/A.jpg'])
+        mock_head_object.assert_not_called()
+        mock_make_session.return_value.get.assert_not_called()
+
+    @patch('src.images.make_session')
+    def test_image_mirror_submits_each_item_once(self, mock_make_session):
+        session = mock_make_session.return_value
+        session.get.return_value = MagicMock(status_code=200, content=b'jpeg', headers={'Content-Type': 'image/jpeg'})
+        # Overlapping pages submit item A twice before the run asks for the results
+        with ImageMirror(self.s3, self.bucket, max_workers=2) as image_mirror:
+            image_mirror.submit([{'item_id': 'A', 'image_url': 'https://x/a.jpg'}])
+            image_mirror.submit([{'item_id': 'A', 'image_url': 'https://x/a.jpg'}, {'item_id': 'B', 'image_url': None}])
+            s3_urls = image_mirror.results([{'item_id': 'B', 'image_url': None}, {'item_id': 'A', 'image_url': 'https://x/a.jpg'}])
+        self.assertEqual(s3_urls, [None, 's3://test-bucket/A.jpg'])
+        session.get.assert_called_once()
+
+    @patch('src.images.make_session')
+    def test_image_mirror_counts_uploads(self, mock_make_session):
+        # B is found by its HEAD check and C fails to download, so only A is an upload
+        mock_make_session.return_value.get.side_effect = lambda url, timeout: MagicMock(
+            status_code=200 if url.endswith('a.jpg') else 403, content=b'jpeg', headers={})
+        self.s3.put_object(Bucket=self.bucket, Key='B.jpg', Body=b'jpeg')
+        with ImageMirror(self.s3, self.bucket, max_workers=2) as image_mirror:
+            s3_urls = image_mirror.results([{'item_id': item_id, 'image_url': f'https://x/{item_id.lower()}.jpg'}
+                                            for item_id in 'ABC'])
+        self.assertEqual(s3_urls, ['s3://test-bucket/A.jpg', 's3://test-bucket/B.jpg', None])
+        self.assertEqual(image_mirror.uploaded, 1)
+
+    def test_missing_index(self):
+        self.assertIsNone(load_known_images(self.s3, self.bucket))
+        save_known_images(self.s3, self.bucket, {'B.jpg', 'A.jpg'})
+        self.assertEqual(load_known_images(self.s3, self.bucket), {'A.jpg', 'B.jpg'})
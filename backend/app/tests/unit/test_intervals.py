@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.analysis import mark_new_items
+from src.intervals import compact_observations, expand_intervals, listed_at, new_observations, read_intervals, write_intervals
+
+
+class TestIntervals(unittest.TestCase):
+    def setUp(self):
+        # A stays listed but is repriced at 300, B drops out at 200 and returns, C is listed once
+        self.df = pd.DataFrame({
+            'uuid': ['A100', 'B100', 'A200', 'A300', 'B300', 'C300', 'A400', 'B400'],
+            'item_id': ['A', 'B', 'A', 'A', 'B', 'C', 'A', 'B'],
+            'timestamp': [100, 100, 200, 300, 300, 300, 400, 400],
+            'title': ['Lindy', 'Kelly', 'Lindy', 'Lindy', 'Kelly', 'Picotin', 'Lindy', 'Kelly'],
+            'price': [100, 200, 100, 120, 200, 300, 120, 200],
+        })
+
+    def test_compact_observations(self):
+        intervals, runs = compact_observations(self.df.sample(frac=1, random_state=0))
+        self.assertEqual(runs.tolist(), [100, 200, 300, 400])
+        self.assertEqual(
+            intervals[['item_id', 'first_seen', 'last_seen', 'price']].values.tolist(),
+            [['A', 100, 200, 100], ['A', 300, 400, 120], ['B', 100, 100, 200], ['B', 300, 400, 200], ['C', 300, 300, 300]]
+        )
+
+    def test_round_trip(self):
+        intervals, runs = compact_observations(self.df)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'intervals.parquet')
+            write_intervals(intervals, runs, path)
+            intervals, runs = read_intervals(path)
+
+        observations = expand_intervals(intervals, runs)[self.df.columns]
+        expected = self.df.sort_values(['timestamp', 'item_id']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(observations.sort_values(['timestamp', 'item_id']).reset_index(drop=True), expected, check_dtype=False)
+
+    def test_listed_at(self):
+        intervals, runs = compact_observations(self.df)
+        self.assertTrue(listed_at(intervals, runs, 'B', 100))
+        self.assertFalse(listed_at(intervals, runs, 'B', 250))
+        self.assertTrue(listed_at(intervals, runs, 'B', 1000))
+        self.assertFalse(listed_at(intervals, runs, 'A', 50))
+
+    def test_new_observations_match_notebook(self):
+        df = pd.concat([self.df, self.df.iloc[[0]]])
+        marked = mark_new_items(df)
+        expected = set(zip(marked[marked['is_new'] == '1']['item_id'], marked[marked['is_new'] == '1']['timestamp']))
+
+        new = new_observations(*compact_observations(df))
+        self.assertEqual(set(zip(new['item_id'], new['timestamp'])), expected)
+        self.assertEqual(len(new), len(expected))
@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+import boto3
+from moto import mock_aws
+from src.inventory_store import (
+    compact_partitions, iter_rows, list_partition_keys, partition_key, read_last_run, read_last_run_from_csv,
+    rollup_csv, write_partition
+)
+from src.s3_stream import open_csv
+from tests.unit.factories import make_row
+
+
+class TestInventoryStore(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    def test_partition_key(self):
+        self.assertEqual(partition_key(1716155767), 'inventory/dt=2024-05-19/1716155767.csv')
+
+    def test_read_last_run(self):
+        self.assertEqual(read_last_run(self.s3, self.bucket), (0, []))
+
+        write_partition(self.s3, self.bucket, 1716155767, [make_row('A', 1716155767)])
+        write_partition(self.s3, self.bucket, 1716156367, [make_row('A', 1716156367), make_row('B', 1716156367)])
+
+        timestamp, rows = read_last_run(self.s3, self.bucket)
+        self.assertEqual(timestamp, 1716156367)
+        self.assertEqual([row['item_id'] for row in rows], ['A', 'B'])
+
+    def test_compact_partitions(self):
+        write_partition(self.s3, self.bucket, 1716155767, [make_row('A', 1716155767)])
+        write_partition(self.s3, self.bucket, 1716156367, [make_row('B', 1716156367)])
+
+        compacted_key = compact_partitions(self.s3, self.bucket, '2024-05-19')
+
+        self.assertEqual(list_partition_keys(self.s3, self.bucket), [compacted_key])
+        self.assertEqual([row['item_id'] for row in iter_rows(self.s3, self.bucket)], ['A', 'B'])
+        self.assertEqual(read_last_run(self.s3, self.bucket)[0], 1716156367)
+        self.assertIsNone(compact_partitions(self.s3, self.bucket, '2024-05-19'))
+
+    def test_compaction_survives_failed_deletes(self):
+        write_partition(self.s3, self.bucket, 1716155767, [make_row('A', 1716155767)])
+        write_partition(self.s3, self.bucket, 1716156367, [make_row('B', 1716156367)])
+        # S3 reports per-key failures in the response, leaving the sources next to the compacted object
+        failed = {'Deleted': [], 'Errors': [{'Key': 'inventory/dt=2024-05-19/1716155767.csv', 'Code': 'InternalError', 'Message': ''}]}
+        with patch.object(self.s3, 'delete_objects', return_value=failed):
+            compact_partitions(self.s3, self.bucket, '2024-05-19')
+        write_partition(self.s3, self.bucket, 1716157000, [make_row('C', 1716157000)])
+
+        compact_partitions(self.s3, self.bucket, '2024-05-19')
+
+        self.assertEqual(len(list_partition_keys(self.s3, self.bucket)), 1)
+        self.assertEqual([row['item_id'] for row in iter_rows(self.s3, self.bucket)], ['A', 'B', 'C'])
+
+    def test_rollup_csv(self):
+        # The legacy file has no image or availability columns, which the rollup keeps as they are
+        self.s3.put_object(Bucket=self.bucket, Key='hermes_inventory.csv', Body=(
+            'uuid,item_id,timestamp,price,url,color,title\n'
+            'A1716155767,A,1716155767,7300,/a/,Red,Lindy\n'
+        ).encode('utf-8'))
+        write_partition(self.s3, self.bucket, 1716155767, [make_row('A', 1716155767)])
+        write_partition(self.s3, self.bucket, 1716156367, [make_row('A', 1716156367), make_row('B', 1716156367)])
+
+        self.assertEqual(rollup_csv(self.s3, self.bucket), 2)
+        self.assertEqual(rollup_csv(self.s3, self.bucket), 0)
+
+        reader = open_csv(self.s3, self.bucket, 'hermes_inventory.csv')
+        rows = list(reader)
+        self.assertEqual(reader.fieldnames, ['uuid', 'item_id', 'timestamp', 'price', 'url', 'color', 'title'])
+        self.assertEqual([row['uuid'] for row in rows], ['A1716155767', 'A1716156367', 'B1716156367'])
+        self.assertEqual(read_last_run_from_csv(self.s3, self.bucket)[0], 1716156367)
+        self.assertEqual(len(read_last_run_from_csv(self.s3, self.bucket)[1]), 2)
@@ -0,0 +1,17 @@
+import unittest
+from src.listing_parser import extract_item_info
+
+
+class TestListingParser(unittest.TestCase):
+    def test_card_without_image(self):
+        html = ('<html><div class="product-grid-list-item" id="grid-product-1"><span class="product-item-name">Item 1</span>'
+                '<span class="product-item-colors">Color: Red</span><a href="/item-1-url">Link</a>'
+                '<span class="price">AU$1,100</span></div></html>')
+        self.assertEqual(extract_item_info(html), [{
+            'item_id': '1', 'title': 'Item 1', 'color': 'Red', 'url': '/item-1-url',
+            'price': 1100, 'unavailable': False, 'image_url': None
+        }])
+
+    def test_empty_page(self):
+        self.assertEqual(extract_item_info(''), [])
+        self.assertEqual(extract_item_info('<html><body>Blocked</body></html>'), [])
@@ -0,0 +1,40 @@
+import unittest
+import boto3
+from moto import mock_aws
+from src.manifest import fingerprint_items, load_manifest, save_manifest
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    def test_missing_manifest(self):
+        self.assertIsNone(load_manifest(self.s3, self.bucket))
+
+    def test_round_trip(self):
+        save_manifest(self.s3, self.bucket, 1716155767, ['H083618CKAB', 'H079086CK0Y'])
+        save_manifest(self.s3, self.bucket, 1716156367, iter(['H083618CKAB']))
+
+        manifest = load_manifest(self.s3, self.bucket)
+        self.assertEqual(manifest['timestamp'], 1716156367)
+        self.assertEqual(manifest['item_ids'], {'H083618CKAB'})
+
+    def test_fingerprint_ignores_order_and_presentation(self):
+        items = [
+            {'item_id': 'H079086CK0Y', 'title': 'Lindy mini bag', 'price': 11640, 'unavailable': True},
+            {'item_id': 'H083618CKAB', 'title': 'Steeple 25 bag', 'price': 7300, 'unavailable': False},
+        ]
+        reordered = [dict(items[1], title='Steeple bag'), items[0]]
+        self.assertEqual(fingerprint_items(items), fingerprint_items(reordered))
+
+        repriced = [items[0], dict(items[1], price=7500)]
+        self.assertNotEqual(fingerprint_items(items), fingerprint_items(repriced))
+        restocked = [dict(items[0], unavailable=False), items[1]]
+        self.assertNotEqual(fingerprint_items(items), fingerprint_items(restocked))
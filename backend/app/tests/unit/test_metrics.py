@@ -0,0 +1,42 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from src.metrics import Metrics, NullMetrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_spans_and_counters(self):
+        metrics = Metrics()
+        for _ in range(2):
+            with metrics.span('page_load'):
+                pass
+        metrics.incr('items_parsed', 14)
+        metrics.incr('page_bytes', 731448, 'Bytes')
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            metrics.emit()
+        summary = json.loads(output.getvalue())
+
+        self.assertEqual(summary['Service'], 'scraper')
+        self.assertEqual(summary['items_parsed'], 14)
+        self.assertGreaterEqual(summary['page_load_ms'], 0)
+        definition = summary['_aws']['CloudWatchMetrics'][0]
+        self.assertEqual(definition['Dimensions'], [['Service']])
+        self.assertIn({'Name': 'page_bytes', 'Unit': 'Bytes'}, definition['Metrics'])
+        self.assertIn({'Name': 'page_load_ms', 'Unit': 'Milliseconds'}, definition['Metrics'])
+
+    def test_disabled(self):
+        with patch.dict(os.environ, {'METRICS_ENABLED': 'false'}):
+            metrics = Metrics.from_env()
+        self.assertIsInstance(metrics, NullMetrics)
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with metrics.span('parse'):
+                metrics.incr('items_parsed')
+            metrics.emit()
+        self.assertEqual(output.getvalue(), '')
@@ -0,0 +1,24 @@
+import unittest
+from unittest.mock import MagicMock
+from selenium.common.exceptions import WebDriverException
+from src.readiness import BLOCKED, DATADOME, GRID, TIMEOUT, wait_for_page
+
+
+class TestReadiness(unittest.TestCase):
+    def test_returns_first_state(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = [None, WebDriverException("navigating"), GRID]
+        self.assertEqual(wait_for_page(driver, timeout=5), GRID)
+        self.assertEqual(driver.execute_script.call_count, 3)
+
+    def test_challenge_and_block(self):
+        for state in (DATADOME, BLOCKED):
+            driver = MagicMock()
+            driver.execute_script.return_value = state
+            self.assertEqual(wait_for_page(driver, timeout=5), state)
+            driver.execute_script.assert_called_once()
+
+    def test_timeout(self):
+        driver = MagicMock()
+        driver.execute_script.return_value = None
+        self.assertEqual(wait_for_page(driver, timeout=0.3), TIMEOUT)
@@ -0,0 +1,43 @@
+import unittest
+import boto3
+from moto import mock_aws
+from src.s3_stream import MultipartWriter, open_csv
+
+
+class TestS3Stream(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    def test_multipart_round_trip(self):
+        line = 'H083618CKAB1716155767,H083618CKAB,1716155767,"Steeple 25 bag, Multi-colored"\n'
+        part_size = 5 * 2 ** 20
+        with MultipartWriter(self.s3, self.bucket, 'history.csv', part_size=part_size) as output:
+            output.write('uuid,item_id,timestamp,title\n')
+            for _ in range(2 * part_size // len(line) + 1):
+                output.write(line)
+
+        self.assertEqual(len(output.parts), 2)
+        self.assertEqual(self.s3.head_object(Bucket=self.bucket, Key='history.csv')['ContentLength'], output.bytes_written)
+        rows = open_csv(self.s3, self.bucket, 'history.csv')
+        first = next(rows)
+        self.assertEqual(first['title'], 'Steeple 25 bag, Multi-colored')
+        self.assertEqual(sum(1 for _ in rows) + 1, 2 * part_size // len(line) + 1)
+
+    def test_small_object_and_abort(self):
+        self.assertIsNone(open_csv(self.s3, self.bucket, 'missing.csv'))
+        with MultipartWriter(self.s3, self.bucket, 'small.csv') as output:
+            output.write('a,b\n1,"x\ny"\n')
+        self.assertEqual(list(open_csv(self.s3, self.bucket, 'small.csv')), [{'a': '1', 'b': 'x\ny'}])
+
+        with self.assertRaises(RuntimeError):
+            with MultipartWriter(self.s3, self.bucket, 'small.csv') as output:
+                output.write('a,b\n2,z\n')
+                raise RuntimeError("interrupted")
+        self.assertEqual(list(open_csv(self.s3, self.bucket, 'small.csv')), [{'a': '1', 'b': 'x\ny'}])
@@ -0,0 +1,55 @@
+import base64
+import unittest
+from unittest.mock import MagicMock
+import boto3
+from moto import mock_aws
+from src.metrics import Metrics
+from src.screenshots import ScreenshotUploader, capture, parse_policy, screenshot_key, should_capture
+
+
+class TestScreenshots(unittest.TestCase):
+    def test_should_capture(self):
+        self.assertTrue(should_capture(1717200000, failed=False, policy=parse_policy('always')))
+        self.assertTrue(should_capture(1717200000, failed=True, policy=parse_policy('failure')))
+        self.assertFalse(should_capture(1717200000, failed=False, policy=parse_policy('failure')))
+        self.assertFalse(should_capture(1717200000, failed=True, policy=parse_policy('never')))
+        sampled = [should_capture(timestamp, failed=False, policy=parse_policy('every:4')) for timestamp in range(1717200000, 1717204000)]
+        self.assertAlmostEqual(sum(sampled) / len(sampled), 0.25, delta=0.05)
+        self.assertTrue(should_capture(1717200001, failed=True, policy=parse_policy('every:1000')))
+
+    def test_malformed_policy_falls_back_to_default(self):
+        self.assertEqual(parse_policy('every:4'), ('every', 4))
+        for value in ('every:x', 'every:0', 'sometimes'):
+            self.assertEqual(parse_policy(value), ('failure', None))
+
+    def test_keys_are_per_endpoint(self):
+        first = screenshot_key(1717200000, 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/', 'datadome')
+        second = screenshot_key(1717200000, 'https://fu5te2nc0l.execute-api.ap-southeast-2.amazonaws.com/prod/', 'datadome', 'jpeg')
+        self.assertEqual(first, 'screenshots/dt=2024-06-01/1717200000-abc123-9617817f-datadome.webp')
+        self.assertEqual(second, 'screenshots/dt=2024-06-01/1717200000-fu5te2nc0l-9617817f-datadome.jpg')
+        # Extra listings are other paths on the same API Gateway
+        bags = screenshot_key(1717200000, 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/bags', 'grid')
+        shoes = screenshot_key(1717200000, 'https://abc123.execute-api.us-west-2.amazonaws.com/prod/shoes', 'grid')
+        self.assertNotEqual(bags, shoes)
+
+    def test_capture_scales_and_encodes_in_chrome(self):
+        driver = MagicMock()
+        driver.execute_cdp_cmd.side_effect = lambda command, params: {
+            'Page.getLayoutMetrics': {'cssLayoutViewport': {'pageX': 0, 'pageY': 0, 'clientWidth': 1600, 'clientHeight': 900}},
+            'Page.captureScreenshot': {'data': base64.b64encode(b'webp').decode()}
+        }[command]
+        self.assertEqual(capture(driver, 'webp', quality=50, width=800), b'webp')
+        params = driver.execute_cdp_cmd.call_args[0][1]
+        self.assertEqual((params['format'], params['quality'], params['clip']['scale']), ('webp', 50, 0.5))
+
+    @mock_aws
+    def test_uploader_waits_for_pending_uploads(self):
+        s3 = boto3.client('s3', region_name='us-west-2')
+        s3.create_bucket(Bucket='test-bucket', CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+        metrics = Metrics()
+        with ScreenshotUploader(s3, 'test-bucket', metrics) as uploader:
+            uploader.submit('screenshots/a.webp', b'a')
+            uploader.submit('screenshots/b.webp', b'bb')
+        response = s3.get_object(Bucket='test-bucket', Key='screenshots/b.webp')
+        self.assertEqual((response['Body'].read(), response['ContentType']), (b'bb', 'image/webp'))
+        self.assertEqual(metrics.values['bytes_written'], 3)
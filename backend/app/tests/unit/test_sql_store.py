@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import boto3
+import pandas as pd
+from moto import mock_aws
+from src import sql_store
+from src.analysis import daily_new_items, mark_new_items
+from src.inventory_store import write_partition
+from tests.unit.factories import make_row
+
+
+class TestSqlStore(unittest.TestCase):
+    def setUp(self):
+        self.conn = sql_store.connect(':memory:')
+        # A stays listed across two days and is repriced, B sells out and is restocked, C drops out and returns
+        self.rows = [
+            make_row('A', 1717113600), make_row('B', 1717113600), make_row('C', 1717113600),
+            make_row('A', 1717114200), make_row('B', 1717114200, available='False'),
+            make_row('A', 1717200000, price='7500'), make_row('B', 1717200000), make_row('C', 1717200000),
+        ]
+        sql_store.insert_rows(self.conn, self.rows)
+
+    def test_new_items_per_day_matches_notebook(self):
+        view = pd.read_sql_query("SELECT * FROM new_items_per_day", self.conn)
+        expected = daily_new_items(mark_new_items(pd.DataFrame(self.rows).astype({'timestamp': int})))
+        self.assertEqual(list(zip(view['item_id'], view['timestamp'])), list(zip(expected['item_id'], expected['timestamp'])))
+        self.assertEqual(list(view.columns), ['uuid', 'item_id', 'timestamp', 'price', 'url', 'color', 'title', 'is_new', 'date'])
+
+    def test_price_changes_and_restocks(self):
+        changes = self.conn.execute("SELECT item_id, timestamp, previous_price, price FROM price_changes").fetchall()
+        self.assertEqual([tuple(row) for row in changes], [('A', 1717200000, 7300, 7500)])
+        restocks = self.conn.execute("SELECT item_id, timestamp FROM restocks").fetchall()
+        self.assertEqual([tuple(row) for row in restocks], [('B', 1717200000)])
+
+    def test_insert_is_incremental(self):
+        self.assertEqual(sql_store.insert_rows(self.conn, self.rows), 0)
+        self.assertEqual(sql_store.insert_rows(self.conn, [make_row('A', 1717200600)]), 1)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 4)
+
+    def test_sync_from_s3(self):
+        with mock_aws():
+            s3 = boto3.client('s3', region_name='us-west-2')
+            s3.create_bucket(Bucket='test-bucket', CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+            write_partition(s3, 'test-bucket', 1717200000, [make_row('A', 1717200000, price='7500')])
+            write_partition(s3, 'test-bucket', 1717200600, [make_row('A', 1717200600, price='7500')])
+            self.assertEqual(sql_store.sync_from_s3(self.conn, s3, 'test-bucket'), 1)
+        self.assertEqual(sql_store.last_run_timestamp(self.conn), 1717200600)
+
+    def test_insert_table_matches_insert_rows(self):
+        conn = sql_store.connect(':memory:')
+        conn.execute("CREATE TABLE staged (item_id, timestamp, title, color, url, price, available, s3_image_url)")
+        conn.executemany("INSERT INTO staged VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+            (row['item_id'], int(row['timestamp']), row['title'], row['color'], row['url'], int(row['price']),
+             int(row['available'] == 'True'), None) for row in reversed(self.rows)])
+        self.assertEqual(sql_store.insert_table(conn, 'staged'), len(self.rows))
+        query = "SELECT item_id, timestamp, date, price, available, is_new FROM observations ORDER BY item_id, timestamp"
+        self.assertEqual([tuple(row) for row in conn.execute(query)], [tuple(row) for row in self.conn.execute(query)])
+
+    def test_insert_table_backfills_older_runs(self):
+        # The newest runs are synced first and an export of the older ones is ingested afterwards
+        conn = sql_store.connect(':memory:')
+        conn.execute("CREATE TABLE staged (item_id, timestamp, title, color, url, price, available, s3_image_url)")
+        staged = [(row['item_id'], int(row['timestamp']), row['title'], row['color'], row['url'], int(row['price']),
+                   int(row['available'] == 'True'), None) for row in self.rows]
+        for part in (staged[5:], staged[:5] + staged[5:6]):
+            conn.execute("DELETE FROM staged")
+            conn.executemany("INSERT INTO staged VALUES (?, ?, ?, ?, ?, ?, ?, ?)", part)
+            sql_store.insert_table(conn, 'staged')
+        query = "SELECT item_id, timestamp, price, is_new FROM observations ORDER BY item_id, timestamp"
+        self.assertEqual([tuple(row) for row in conn.execute(query)], [tuple(row) for row in self.conn.execute(query)])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0], 3)
+
+    def test_load_csv_backfills_after_sync(self):
+        # A store synced from S3 first still takes the older history from a CSV export
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'output.csv')
+            pd.DataFrame(self.rows[:5]).to_csv(path, index=False)
+            conn = sql_store.connect(':memory:')
+            sql_store.insert_rows(conn, self.rows[5:])
+            self.assertEqual(sql_store.load_csv(conn, path), 5)
+            self.assertEqual(sql_store.load_csv(conn, path), 0)
+        query = "SELECT item_id, timestamp, price, available, is_new FROM observations ORDER BY item_id, timestamp"
+        self.assertEqual([tuple(row) for row in conn.execute(query)], [tuple(row) for row in self.conn.execute(query)])
+
+    def test_connect_rejects_old_sqlite(self):
+        with patch.object(sql_store.sqlite3, 'sqlite_version_info', (3, 7, 17)):
+            with self.assertRaisesRegex(RuntimeError, 'SQLite 3.25.0 or newer'):
+                sql_store.connect(':memory:')
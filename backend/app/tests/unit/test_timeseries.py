@@ -0,0 +1,70 @@
+import unittest
+import boto3
+from moto import mock_aws
+from src.events import apply_events, diff_items, write_events
+from src.timeseries import UNLISTED, TimeSeriesIndex, build_index, load_index, update_index
+from tests.unit.factories import make_item
+
+
+RUNS = [
+    (100, [make_item('A'), make_item('B')]),
+    (200, [make_item('A', price=7500), make_item('B')]),
+    (300, [make_item('A', price=7500, unavailable=True)]),
+    (400, [make_item('A', price=7500, unavailable=True), make_item('B'), make_item('C')]),
+]
+
+
+def run_events():
+    state = {}
+    for timestamp, items in RUNS:
+        events = diff_items(state, items, timestamp)
+        apply_events(state, events)
+        yield timestamp, events
+
+
+class TestTimeSeriesIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = build_index(event for _, events in run_events() for event in events)
+
+    def test_history(self):
+        self.assertEqual(self.index.history('A'), [(100, 7300, True), (200, 7500, True), (300, 7500, False)])
+        self.assertEqual(self.index.history('B'), [(100, 7300, True), (300, UNLISTED, False), (400, 7300, True)])
+        self.assertEqual(self.index.history('B', 200, 400), [(300, UNLISTED, False)])
+        self.assertEqual(self.index.history('Z'), [])
+
+    def test_scan_and_first_seen(self):
+        self.assertEqual(self.index.scan(300, 500), [
+            ('A', 300, 7500, False), ('B', 300, UNLISTED, False), ('B', 400, 7300, True), ('C', 400, 7300, True)
+        ])
+        self.assertEqual(self.index.first_seen_between(100, 400), [('A', 100), ('B', 100)])
+        self.assertEqual(self.index.first_seen_between(150, 1000), [('C', 400)])
+
+    def test_round_trip(self):
+        index = TimeSeriesIndex.from_bytes(self.index.to_bytes())
+        self.assertEqual(index.history('A'), self.index.history('A'))
+        self.assertEqual(index.item_ids.tolist(), ['A', 'B', 'C'])
+
+
+class TestUpdateIndex(unittest.TestCase):
+    def setUp(self):
+        self.mock_aws = mock_aws()
+        self.mock_aws.start()
+        self.s3 = boto3.client('s3', region_name='us-west-2')
+        self.bucket = 'test-bucket'
+        self.s3.create_bucket(Bucket=self.bucket, CreateBucketConfiguration={'LocationConstraint': 'us-west-2'})
+
+    def tearDown(self):
+        self.mock_aws.stop()
+
+    def test_incremental_matches_full_build(self):
+        runs = list(run_events())
+        # The index starts at the second run, so it is first built from the log and then appended to
+        for timestamp, events in runs:
+            write_events(self.s3, self.bucket, timestamp, events)
+            if timestamp >= 200:
+                update_index(self.s3, self.bucket, events)
+
+        index = load_index(self.s3, self.bucket)
+        expected = build_index(event for _, events in runs for event in events)
+        for item_id in ('A', 'B', 'C'):
+            self.assertEqual(index.history(item_id), expected.history(item_id))
@@ -1,8 +1,5 @@
 import os
 import sys
-import undetected_chromedriver as uc
-from bs4 import BeautifulSoup
-from fake_useragent import UserAgent
 import time
 import json
 import logging
@@ -11,6 +8,9 @@ from datetime import datetime
 import schedule
 import signal
 
+from backend.app.src.driver import DriverManager, build_chrome_options
+from backend.app.src.listing_parser import extract_item_info
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -18,29 +18,13 @@ logger = logging.getLogger(__name__)
 # Global variable to control the script's execution
 running = True
 
+# One Chrome stays warm between scheduled runs instead of starting per run
+driver_manager = DriverManager(options_factory=lambda: build_chrome_options(window_size='1920,1080'))
+
 def main():
     logger.info("Starting script")
     logger.info(f"Python version: {sys.version}")
 
-    ua = UserAgent()
-    user_agent = ua.random
-
-    chrome_options = uc.ChromeOptions()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument(f'user-agent={user_agent}')
-
-    try:
-        logger.info("Attempting to create Chrome driver")
-        driver = uc.Chrome(options=chrome_options)
-        logger.info("Successfully created Chrome driver")
-    except Exception as e:
-        logger.error(f"Error creating Chrome driver: {str(e)}")
-        return
-
     # Replace these with your actual URLs
     urls = [
         'https://www.hermes.com/au/en/category/women/bags-and-small-leather-goods/bags-and-clutches/#|',
@@ -53,27 +37,25 @@ def main():
         try:
             logger.info(f"Fetching response from {url}")
 
-            driver.get(url)
-            
-            # Check for CAPTCHA
-            if check_and_solve_captcha(driver):
-                logger.info("CAPTCHA solved successfully")
-            else:
-                logger.info("No CAPTCHA detected or unable to solve")
+            with driver_manager.driver() as driver:
+                driver.get(url)
+
+                # Check for CAPTCHA
+                if check_and_solve_captcha(driver):
+                    logger.info("CAPTCHA solved successfully")
+                else:
+                    logger.info("No CAPTCHA detected or unable to solve")
 
-            page_source = driver.page_source
-            driver.save_screenshot(f'screenshots/{timestamp}.png')
+                page_source = driver.page_source
+                driver.save_screenshot(f'screenshots/{timestamp}.png')
             logger.info(f"Page source length: {len(page_source)}")
 
             if "Blocked" not in page_source:
-                soup = BeautifulSoup(page_source, 'html.parser')
-                items.extend(extract_item_info(soup))
+                items.extend(extract_item_info(page_source))
             else:
                 logger.error(f"Error fetching response from {url}: Request unsuccessful")
         except Exception as e:
             logger.error(f"Error fetching response from {url}: {str(e)}")
-    
-    driver.quit()
 
     unique_items = {item['item_id']: item for item in items}.values()
     if len(unique_items) == 0:
@@ -111,31 +93,6 @@ def check_and_solve_captcha(driver):
             return False
 
 
-def extract_item_info(soup):
-    items = []
-    for div in soup.find_all('div', class_='product-grid-list-item'):
-        item_id = div['id'].replace('grid-product-', '')
-        title = div.find('span', class_='product-item-name').text.strip()
-        color = div.find('span', class_='product-item-colors').text.split(':')[-1].strip()
-        url = div.find('a')['href']
-        price = int(div.find('span', class_='price').text.replace('AU$', '').replace(',', ''))
-        unavailable = 'Unavailable' in div.text
-        
-        # Extract image URL
-        img_tag = div.find('img')
-        image_url = img_tag['src'] if img_tag else None
-        
-        items.append({
-            'item_id': item_id,
-            'title': title,
-            'color': color,
-            'url': url,
-            'price': price,
-            'unavailable': unavailable,
-            'image_url': image_url
-        })
-    return items
-
 def save_items_to_csv(items, timestamp, filename):
     file_exists = os.path.isfile(filename)
     
@@ -158,6 +115,7 @@ def signal_handler(signum, frame):
     global running
     logger.info("Stopping the script...")
     running = False
+    driver_manager.shutdown()
 
 if __name__ == "__main__":
     # Set up signal handler for graceful shutdown
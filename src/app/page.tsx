@@ -3,9 +3,14 @@
 import Image from 'next/image';
 import Link from 'next/link';
 import { useState, useEffect } from 'react';
-import Papa from 'papaparse';
 import { cn } from '@/lib/utils';
 
+// Written by the scraper's dashboard export; the shards already hold only new items, one per item per day.
+// Set NEXT_PUBLIC_DASHBOARD_URL to the stack's DashboardUrl output to read the live export through CloudFront;
+// without it the page reads the public/dashboard snapshot bundled at build time.
+const DASHBOARD_URL = process.env.NEXT_PUBLIC_DASHBOARD_URL ?? '/dashboard';
+const INITIAL_SHARDS = 2;
+
 interface Item {
 	uuid: string;
 	item_id: string;
@@ -14,7 +19,22 @@ interface Item {
 	url: string;
 	color: string;
 	title: string;
-	is_new: number;
+}
+
+interface Shard {
+	month: string;
+	path: string;
+	items: number;
+}
+
+interface DashboardIndex {
+	generated_at: number;
+	shards: Shard[];
+}
+
+async function fetchShard(shard: Shard): Promise<Item[]> {
+	const response = await fetch(`${DASHBOARD_URL}/${shard.path}`);
+	return response.json();
 }
 
 function getWeekNumber(date: Date) {
@@ -45,27 +65,36 @@ const formatDate = (key: string, groupBy: 'day' | 'week' | 'month'): string => {
 
 export default function Home() {
 	const [items, setItems] = useState<Item[]>([]);
+	const [shards, setShards] = useState<Shard[]>([]);
+	const [loadedShards, setLoadedShards] = useState(0);
 	const [groupBy, setGroupBy] = useState<'day' | 'week' | 'month'>('day');
 
 	useEffect(() => {
 		const fetchData = async () => {
-			const response = await fetch('/output.csv');
-			const csvData = await response.text();
+			const response = await fetch(`${DASHBOARD_URL}/index.json`);
+			const index: DashboardIndex = await response.json();
 
-			const { data } = Papa.parse<Item>(csvData, {
-				header: true,
-				dynamicTyping: true,
-			});
+			// Shards are listed newest first, so the first screen only needs the latest months
+			const initial = index.shards.slice(0, INITIAL_SHARDS);
+			const data = await Promise.all(initial.map(fetchShard));
 
-			setItems(data);
+			setShards(index.shards);
+			setLoadedShards(initial.length);
+			setItems(data.flat());
 		};
 
 		fetchData();
 	}, []);
 
-	const filteredItems = items.filter((item) => item.is_new === 1);
+	const loadMore = async () => {
+		const shard = shards[loadedShards];
+		if (!shard) return;
+		const data = await fetchShard(shard);
+		setLoadedShards(loadedShards + 1);
+		setItems((current) => [...current, ...data]);
+	};
 
-	const groupedItems = filteredItems.reduce(
+	const groupedItems = items.reduce(
 		(acc, item) => {
 			const date = new Date(item.timestamp * 1000);
 			let key;
@@ -112,7 +141,6 @@ export default function Home() {
 						date,
 						items: items.sort((a, b) => a.title.localeCompare(b.title) || a.color.localeCompare(b.color)),
 					}))
-					.reverse()
 					.map(({ date, items }) => (
 						<div key={date} className="flex flex-col gap-2 py-10 font-light">
 							<h2 className="text-center">{formatDate(date, groupBy)}</h2>
@@ -131,6 +159,11 @@ export default function Home() {
 							</div>
 						</div>
 					))}
+				{loadedShards < shards.length && (
+					<button className="w-full py-10 uppercase" onClick={loadMore}>
+						Load more
+					</button>
+				)}
 			</div> */}
 		</main>
 	);